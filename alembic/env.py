@@ -26,6 +26,7 @@ sys.path.insert(0, os.path.abspath("."))
 # add your model's MetaData object here
 # for 'autogenerate' support
 from app.models.property import Base
+import app.models.notification_outbox # noqa: F401 registers its table on Base
 target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
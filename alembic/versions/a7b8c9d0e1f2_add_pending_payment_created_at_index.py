@@ -0,0 +1,30 @@
+"""Add partial index backing the stale pending listing cleanup
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7b8c9d0e1f2'
+down_revision: Union[str, Sequence[str], None] = 'f6a7b8c9d0e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema with a created_at index over listings still awaiting payment."""
+    op.create_index(
+        'idx_properties_pending_payment_created_at', 'properties', ['created_at'],
+        unique=False, postgresql_where=sa.text("payment_status = 'PENDING'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema by dropping the pending payment index."""
+    op.drop_index('idx_properties_pending_payment_created_at', table_name='properties')
@@ -0,0 +1,44 @@
+"""Add notification_outbox table
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8c9d0e1f2a3'
+down_revision: Union[str, Sequence[str], None] = 'a7b8c9d0e1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema with the outbox of owner notifications awaiting delivery."""
+    op.create_table(
+        'notification_outbox',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'SENT', 'FAILED', name='outboxstatus', native_enum=False), nullable=False, server_default='PENDING'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        'idx_notification_outbox_pending_next_attempt', 'notification_outbox', ['next_attempt_at'],
+        unique=False, postgresql_where=sa.text("status = 'PENDING'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema by dropping the notification outbox."""
+    op.drop_index('idx_notification_outbox_pending_next_attempt', table_name='notification_outbox')
+    op.drop_table('notification_outbox')
@@ -0,0 +1,35 @@
+"""Add composite indexes backing keyset pagination of approved listings
+
+Revision ID: c3d4e5f6a7b8
+Revises: aa1b2c3d4e5f
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d4e5f6a7b8'
+down_revision: Union[str, Sequence[str], None] = 'aa1b2c3d4e5f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema with (created_at, id) and (price, id) partial indexes on approved listings."""
+    op.create_index(
+        'idx_properties_approved_created_at_id', 'properties', ['created_at', 'id'],
+        unique=False, postgresql_where=sa.text("status = 'APPROVED'")
+    )
+    op.create_index(
+        'idx_properties_approved_price_id', 'properties', ['price', 'id'],
+        unique=False, postgresql_where=sa.text("status = 'APPROVED'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema by dropping the keyset pagination indexes."""
+    op.drop_index('idx_properties_approved_price_id', table_name='properties')
+    op.drop_index('idx_properties_approved_created_at_id', table_name='properties')
@@ -0,0 +1,39 @@
+"""Add payment initiation claim columns and the INITIATING payment status
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d0e1f2a3b4'
+down_revision: Union[str, Sequence[str], None] = 'b8c9d0e1f2a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema with the idempotency key and results of payment initiation."""
+    # ALTER TYPE ... ADD VALUE cannot be used inside the transaction that adds it
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE paymentstatus ADD VALUE IF NOT EXISTS 'INITIATING'")
+    op.add_column('properties', sa.Column('payment_request_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.add_column('properties', sa.Column('payment_initiated_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('properties', sa.Column('payment_tx_ref', sa.String(length=255), nullable=True))
+    op.add_column('properties', sa.Column('payment_checkout_url', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema by dropping the payment initiation columns."""
+    # Enum values cannot be dropped; claims still in flight fall back to PENDING
+    op.execute("UPDATE properties SET payment_status = 'PENDING' WHERE payment_status = 'INITIATING'")
+    op.drop_column('properties', 'payment_checkout_url')
+    op.drop_column('properties', 'payment_tx_ref')
+    op.drop_column('properties', 'payment_initiated_at')
+    op.drop_column('properties', 'payment_request_id')
@@ -0,0 +1,48 @@
+"""Create the fts maintenance trigger and backfill the fts column
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e5f6a7b8c9'
+down_revision: Union[str, Sequence[str], None] = 'c3d4e5f6a7b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Keep in sync with update_fts_column() in sql/schema.sql
+FTS_DOCUMENT = "to_tsvector('english', {row}title || ' ' || {row}description || ' ' || {row}location || ' ' || COALESCE({row}house_type, ''))"
+
+
+def upgrade() -> None:
+    """Upgrade schema so the ORM's fts column and fts_idx match sql/schema.sql."""
+    op.execute("ALTER TABLE properties ADD COLUMN IF NOT EXISTS fts tsvector")
+    op.execute("CREATE INDEX IF NOT EXISTS fts_idx ON properties USING gin(fts)")
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION update_fts_column() RETURNS trigger AS $$
+        BEGIN
+          NEW.fts := {FTS_DOCUMENT.format(row='NEW.')};
+        RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("DROP TRIGGER IF EXISTS update_fts ON properties")
+    op.execute("""
+        CREATE TRIGGER update_fts
+        BEFORE INSERT OR UPDATE ON properties
+        FOR EACH ROW EXECUTE PROCEDURE update_fts_column()
+    """)
+    # Backfill rows written before the trigger existed
+    op.execute(f"UPDATE properties SET fts = {FTS_DOCUMENT.format(row='')} WHERE fts IS NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema by removing the fts trigger and function (the column and index are kept)."""
+    op.execute("DROP TRIGGER IF EXISTS update_fts ON properties")
+    op.execute("DROP FUNCTION IF EXISTS update_fts_column()")
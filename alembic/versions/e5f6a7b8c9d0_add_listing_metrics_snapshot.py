@@ -0,0 +1,40 @@
+"""Add the listing_metrics_snapshot materialized view
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f6a7b8c9d0'
+down_revision: Union[str, Sequence[str], None] = 'd4e5f6a7b8c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema with a one-row metrics rollup refreshed by the scheduler."""
+    op.execute("""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS listing_metrics_snapshot AS
+        SELECT
+            1 AS id,
+            count(*) AS total_listings,
+            count(*) FILTER (WHERE status = 'PENDING') AS pending,
+            count(*) FILTER (WHERE status = 'APPROVED') AS approved,
+            count(*) FILTER (WHERE status = 'REJECTED') AS rejected,
+            COALESCE(sum(price) FILTER (WHERE payment_status = 'SUCCESS'), 0) AS total_revenue,
+            now() AS refreshed_at
+        FROM properties
+    """)
+    # REFRESH ... CONCURRENTLY requires a unique index
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_listing_metrics_snapshot_id ON listing_metrics_snapshot (id)")
+
+
+def downgrade() -> None:
+    """Downgrade schema by dropping the metrics snapshot."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS listing_metrics_snapshot")
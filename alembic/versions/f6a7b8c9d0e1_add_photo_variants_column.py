@@ -0,0 +1,31 @@
+"""Add photo_variants column to properties
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a7b8c9d0e1'
+down_revision: Union[str, Sequence[str], None] = 'e5f6a7b8c9d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema to store the resized variants of each photo."""
+    op.add_column(
+        'properties',
+        sa.Column('photo_variants', postgresql.JSONB(), server_default=sa.text("'[]'::jsonb"), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema by removing the photo_variants column."""
+    op.drop_column('properties', 'photo_variants')
@@ -1,7 +1,18 @@
+from typing import List, Literal, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    DB_ECHO: bool = False # Logs every statement; for local debugging only
+    # Connection pool per worker: workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) must stay
+    # below Postgres' max_connections
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10.0 # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800 # seconds; replaces connections before idle timeouts drop them
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 30000 # 0 disables
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100 # per connection; 0 behind a transaction-pooling PgBouncer
     USER_MANAGEMENT_URL: str
     PAYMENT_SERVICE_URL: str
     PAYMENT_SERVICE_API_KEY: str
@@ -15,12 +26,111 @@ class Settings(BaseSettings):
     BUCKET_NAME: str
     GEBETA_API_KEY: str # Added Gebeta API Key
     MAX_FILE_MB: int = 5 # Added Max File MB with a default
+    UPLOAD_INFLIGHT_MAX_MB: int = 64 # Upload bytes a worker holds at once; further uploads wait
+
+    # Object storage: "supabase", or "local" to write files under STORAGE_LOCAL_DIR
+    STORAGE_BACKEND: Literal["supabase", "local"] = "supabase"
+    STORAGE_MAX_WORKERS: int = 16 # Threads running blocking storage calls
+    STORAGE_UPLOAD_CONCURRENCY: int = 8 # Parallel uploads per request
+    MAX_PHOTOS_PER_PROPERTY: int = 20
+    # Whole request body, checked before form parsing; None means MAX_PHOTOS_PER_PROPERTY * MAX_FILE_MB + 1
+    MAX_REQUEST_MB: Optional[int] = None
+
+    # Uploaded photos are re-encoded without EXIF at IMAGE_MAX_WIDTH plus smaller variants
+    IMAGE_PROCESSING_ENABLED: bool = True
+    IMAGE_FORMAT: Literal["WEBP", "AVIF"] = "WEBP"
+    IMAGE_QUALITY: int = 80
+    IMAGE_MAX_WIDTH: int = 1600
+    IMAGE_VARIANT_WIDTHS: List[int] = [320, 640, 1024] # The smallest is the listing thumbnail
+    IMAGE_PROCESS_WORKERS: int = 2
+    STORAGE_CHUNK_SIZE: int = 1024 * 1024 # bytes read from an upload at a time
+    STORAGE_LOCAL_DIR: str = "uploads"
+    STORAGE_LOCAL_BASE_URL: str = "http://localhost:8000/uploads"
+
+    # Listing totals: "exact" counts in the page query, "estimated" uses the planner's
+    # row estimate once it reaches LISTING_ESTIMATE_THRESHOLD rows
+    LISTING_TOTAL_MODE: Literal["exact", "estimated"] = "exact"
+    LISTING_ESTIMATE_THRESHOLD: int = 10000
+
+    # Redis response cache for anonymous listing endpoints
+    LISTING_CACHE_ENABLED: bool = True
+    LISTING_CACHE_TTL: int = 60 # seconds
+
+    # Stale PENDING listings are failed CLEANUP_BATCH_SIZE rows per transaction
+    CLEANUP_BATCH_SIZE: int = 500
+
+    # Owner notifications are written to an outbox with the status change and sent by a scheduler job
+    NOTIFICATION_OUTBOX_INTERVAL_SECONDS: int = 5
+    NOTIFICATION_OUTBOX_BATCH_SIZE: int = 100
+    NOTIFICATION_OUTBOX_MAX_ATTEMPTS: int = 8
+    NOTIFICATION_OUTBOX_RETRY_BASE_SECONDS: int = 30 # doubled after every failed attempt
+    NOTIFICATION_OUTBOX_LEASE_SECONDS: int = 120 # a claimed row is retried after this if its worker died
+
+    # Notifications are sent in bulk to {NOTIFICATION_URL}/send/batch when the service supports it
+    NOTIFICATION_BULK_ENABLED: bool = True
+    NOTIFICATION_BULK_RETRY_SECONDS: int = 300 # after the bulk endpoint was missing, probe it again after this
+    NOTIFICATION_BATCH_MAX_SIZE: int = 50
+    NOTIFICATION_SEND_CONCURRENCY: int = 10 # Requests in flight; single sends when bulk is unsupported
+
+    # Serve /metrics from a materialized snapshot refreshed by the scheduler
+    METRICS_SNAPSHOT_ENABLED: bool = False
+    METRICS_SNAPSHOT_INTERVAL_SECONDS: int = 60
+
+    # Verified user data: per-worker LRU (seconds, entries) in front of Redis, capped at the token's exp
+    USER_CACHE_TTL: int = 300
+    USER_CACHE_LOCAL_TTL: int = 60
+    USER_CACHE_LOCAL_MAX_ENTRIES: int = 10000
+
+    # Owner profiles for owner-contact lookups, cached in Redis with a per-worker LRU in front
+    OWNER_CACHE_TTL: int = 600
+    OWNER_NEGATIVE_CACHE_TTL: int = 60 # for users the user service does not know
+    OWNER_CACHE_LOCAL_TTL: int = 60
+    OWNER_CACHE_LOCAL_MAX_ENTRIES: int = 10000
+    USER_SERVICE_BATCH_ENABLED: bool = False # POST /users/batch; otherwise misses are fetched concurrently
+    # Consecutive user service failures before lookups fail fast, and for how long
+    USER_SERVICE_BREAKER_THRESHOLD: int = 5
+    USER_SERVICE_BREAKER_RESET_SECONDS: int = 30
+
+    # "remote" verifies every token with the user service (cached in Redis); "local" trusts
+    # the signed sub/role/exp claims and only asks the user service for revocation checks
+    AUTH_MODE: Literal["remote", "local"] = "remote"
+    AUTH_REVOCATION_CHECK_INTERVAL_SECONDS: int = 300 # per token, per worker; 0 disables periodic checks
+    AUTH_REVOCATION_SAMPLE_RATE: float = 0.0 # extra fraction of requests checked between intervals
+
+    # Geocoding results by normalized location; unresolvable locations are cached briefly
+    GEOCODE_CACHE_TTL: int = 30 * 24 * 3600 # place names rarely move
+    GEOCODE_NEGATIVE_CACHE_TTL: int = 300
+    GEOCODE_CACHE_LOCAL_TTL: int = 3600
+    GEOCODE_CACHE_LOCAL_MAX_ENTRIES: int = 5000
+    # Known places are resolved from the bundled gazetteer; Gebeta is only called on a miss
+    GAZETTEER_ENABLED: bool = True
+    GAZETTEER_PATH: Optional[str] = None # defaults to app/data/gazetteer.csv
+    GAZETTEER_FUZZY_CUTOFF: float = 0.85 # difflib similarity needed to accept a misspelling
+
+    # Shared outbound HTTP clients, one connection pool per upstream service
+    HTTP_TIMEOUT: float = 10.0 # seconds; user management and notification calls
+    PAYMENT_HTTP_TIMEOUT: float = 30.0
+    GEOCODE_HTTP_TIMEOUT: float = 5.0
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0 # seconds an idle connection is kept
+    HTTP2_ENABLED: bool = True # Negotiated per connection; HTTP/1.1 upstreams still work
 
     # Payment specific settings
     PAYMENT_AMOUNT: float = 500.00 # Fixed amount for property approval
     PAYMENT_CURRENCY: str = "ETB"
     CHAPA_IS_TEST_MODE: bool = True # Flag for Chapa sandbox/test mode
     PROPERTY_WEBHOOK_API_KEY: str # API key for incoming webhooks to this service
+    PAYMENT_INITIATION_MAX_RETRIES: int = 3 # retries of a rate limited payment initiation
+    PAYMENT_RETRY_BACKOFF_SECONDS: float = 1.0 # doubled per retry when the service sends no Retry-After
+    PAYMENT_INITIATION_LEASE_SECONDS: int = 180 # a claim older than this is considered abandoned
+    # approve-and-pay?async=true queues initiation for these in-process workers and returns 202
+    PAYMENT_JOB_WORKERS: int = 2
+    PAYMENT_JOB_QUEUE_SIZE: int = 200 # keep below rate * lease; further requests run synchronously
+    PAYMENT_JOB_TTL_SECONDS: int = 3600 # how long a job's status can be polled
+    PAYMENT_RATE_LIMIT_PER_SECOND: float = 5.0 # queued initiations sent to the payment service, per process
+    PAYMENT_RATE_LIMIT_BURST: int = 5
 
     chapa_api_key: str
     chapa_secret_key: str
@@ -1,12 +1,21 @@
+import hashlib
+import random
+import time
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 import httpx
 from app.config import settings
 from app.utils.retry import async_retry
+from app.services.http_clients import USER_MANAGEMENT, get_http_client
+from app.utils.cache import LocalCache, SingleFlight
 import redis.asyncio as redis # Added import
+from redis.exceptions import RedisError
 import json # Added import
 from urllib.parse import urlparse # Added import
+import structlog
+
+logger = structlog.get_logger(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="https://rent-managment-system-user-magt.onrender.com/api/v1/auth/login")
 
@@ -18,27 +27,115 @@ redis_client = redis.Redis(
     db=0, # Default DB
     password=redis_url.password
 )
-USER_CACHE_TTL = 300 # 5 minutes
+USER_CACHE_TTL = settings.USER_CACHE_TTL
+
+# Verified user data per token: a per-worker LRU in front of the shared Redis entry.
+# Both are keyed by a hash of the token so bearer tokens are never stored.
+_user_cache = LocalCache("user_data", settings.USER_CACHE_LOCAL_MAX_ENTRIES, settings.USER_CACHE_LOCAL_TTL)
+_user_lookups = SingleFlight()
+
+# Local mode: tokens confirmed by the user service within the check interval
+_revocation_checked = LocalCache(
+    "auth_revocation_checks", settings.USER_CACHE_LOCAL_MAX_ENTRIES, settings.AUTH_REVOCATION_CHECK_INTERVAL_SECONDS
+)
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _cache_ttl(token: str, ttl: float) -> float:
+    """Caps `ttl` so cached user data never outlives the token's exp claim."""
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        return ttl
+    return min(ttl, exp - time.time()) if exp else ttl
 
 @async_retry()
 async def get_user_data(token: str):
-    cache_key = f"user_data:{token}"
-    
-    # Try to get from cache
-    cached_user_data = await redis_client.get(cache_key)
+    token_key = _token_key(token)
+    user_data = _user_cache.get(token_key)
+    if user_data is not None:
+        return user_data
+    # Concurrent misses for the same token share one Redis/user-service lookup
+    return await _user_lookups.do(token_key, lambda: _load_user_data(token, token_key))
+
+async def _load_user_data(token: str, token_key: str):
+    try:
+        cached_user_data = await redis_client.get(f"user_data:{token_key}")
+    except (RedisError, OSError) as e:
+        logger.warning("user_cache_unavailable", error=str(e))
+        cached_user_data = None
     if cached_user_data:
-        return json.loads(cached_user_data)
-
-    async with httpx.AsyncClient() as client:
-        headers = {"Authorization": f"Bearer {token}"}
-        response = await client.get(f"{settings.USER_MANAGEMENT_URL}/auth/verify", headers=headers)
-        response.raise_for_status() # Will raise an exception for 4xx/5xx responses
-        user_data = response.json()
-        
-        # Cache the user data
-        await redis_client.setex(cache_key, USER_CACHE_TTL, json.dumps(user_data))
+        user_data = json.loads(cached_user_data)
+        _user_cache.set(token_key, user_data, _cache_ttl(token, settings.USER_CACHE_LOCAL_TTL))
         return user_data
 
+    return await verify_token_remote(token)
+
+async def verify_token_remote(token: str):
+    """
+    Asks the user service to verify `token` and refreshes the cached user data.
+    Raises httpx.HTTPStatusError if the token was rejected.
+    """
+    token_key = _token_key(token)
+    client = get_http_client(USER_MANAGEMENT)
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await client.get(f"{settings.USER_MANAGEMENT_URL}/auth/verify", headers=headers)
+    response.raise_for_status() # Will raise an exception for 4xx/5xx responses
+    user_data = response.json()
+
+    # Cache the user data
+    _user_cache.set(token_key, user_data, _cache_ttl(token, settings.USER_CACHE_LOCAL_TTL))
+    redis_ttl = int(_cache_ttl(token, USER_CACHE_TTL))
+    if redis_ttl > 0:
+        try:
+            await redis_client.setex(f"user_data:{token_key}", redis_ttl, json.dumps(user_data))
+        except (RedisError, OSError) as e:
+            logger.warning("user_cache_store_failed", error=str(e))
+    return user_data
+
+async def forget_user_data(token: str):
+    """Drops cached user data for a token the user service no longer accepts."""
+    token_key = _token_key(token)
+    _user_cache.delete(token_key)
+    _revocation_checked.delete(token_key)
+    try:
+        await redis_client.delete(f"user_data:{token_key}")
+    except (RedisError, OSError) as e:
+        logger.warning("user_cache_invalidation_failed", error=str(e))
+
+def _user_from_claims(payload: dict):
+    """The user dict get_user_data would return, built from signed claims. None if claims are missing."""
+    if not payload.get("sub") or not payload.get("role") or not payload.get("exp"):
+        return None
+    user = {"user_id": str(payload["sub"]), "role": payload["role"]}
+    for claim in ("email", "preferred_language"):
+        if claim in payload:
+            user[claim] = payload[claim]
+    return user
+
+def _revocation_check_due(token: str) -> bool:
+    if settings.AUTH_REVOCATION_CHECK_INTERVAL_SECONDS > 0 and _revocation_checked.get(_token_key(token)) is None:
+        return True
+    return random.random() < settings.AUTH_REVOCATION_SAMPLE_RATE
+
+async def _check_revocation(token: str):
+    """
+    Confirms a locally verified token with the user service. A rejection raises
+    httpx.HTTPStatusError; an unreachable user service does not lock users out,
+    since the token's signature and expiry have already been checked.
+    """
+    try:
+        await verify_token_remote(token)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN):
+            await forget_user_data(token)
+            raise
+        logger.warning("token_revocation_check_failed", status_code=e.response.status_code)
+    except (httpx.RequestError, RedisError, OSError) as e:
+        logger.warning("token_revocation_check_failed", error=str(e))
+    _revocation_checked.set(_token_key(token), True)
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -47,6 +144,14 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     )
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"])
+        if settings.AUTH_MODE == "local":
+            # Trust the signed claims; the user service is only asked whether the
+            # token was revoked, once per token per check interval or when sampled
+            user_data = _user_from_claims(payload)
+            if user_data is not None:
+                if _revocation_check_due(token):
+                    await _check_revocation(token)
+                return user_data
         user_data = await get_user_data(token)
         return user_data
     except (JWTError, httpx.HTTPStatusError):
@@ -1,10 +1,109 @@
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config import settings
+from app.utils.geo import register_sqlite_functions
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long checkouts wait for a connection, so the pool
+    (and the number of workers) can be sized against Postgres' max_connections.
+    The time includes opening a new connection when the pool grows.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def recreate(self):
+        # Keep the counters across engine.dispose()
+        pool = super().recreate()
+        pool.__dict__.update(
+            {key: getattr(self, key) for key in ("checkouts", "timeouts", "wait_seconds_total", "wait_seconds_max")}
+        )
+        return pool
+
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+def _engine_options(database_url: str) -> dict:
+    options = {"echo": settings.DB_ECHO}
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        # Local and test databases keep SQLAlchemy's default pooling
+        return options
+
+    options.update(
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if url.get_driver_name() == "asyncpg":
+        connect_args = {
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            "server_settings": {
+                "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS),
+                "application_name": "property-listing-service",
+            },
+        }
+        if not settings.DB_PREPARED_STATEMENT_CACHE_SIZE:
+            # Behind a transaction-pooling PgBouncer asyncpg must not cache statements either
+            connect_args["statement_cache_size"] = 0
+        options["connect_args"] = connect_args
+    return options
+
+
+engine = create_async_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
+if engine.dialect.name == "sqlite":
+    register_sqlite_functions(engine)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+
+def pool_stats() -> dict:
+    """Connection pool occupancy and checkout wait times for this worker."""
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            # Negative while the pool has not opened all of its pool_size connections yet
+            overflow=pool.overflow(),
+        )
+    if isinstance(pool, InstrumentedPool):
+        stats.update(
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            checkouts=pool.checkouts,
+            checkout_timeouts=pool.timeouts,
+            wait_seconds_avg=round(pool.wait_seconds_total / pool.checkouts, 6) if pool.checkouts else None,
+            wait_seconds_max=round(pool.wait_seconds_max, 6),
+        )
+    return stats
+
+
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
@@ -1,4 +1,4 @@
-from fastapi import Depends, FastAPI, Request, APIRouter
+from fastapi import Depends, FastAPI, Request, APIRouter, Header
 from fastapi.middleware.cors import CORSMiddleware # Added import
 from fastapi_limiter import FastAPILimiter
 from fastapi_limiter.depends import RateLimiter
@@ -9,19 +9,32 @@ from app.config import settings
 import structlog
 from apscheduler.schedulers.asyncio import AsyncIOScheduler # Added import
 from app.services.property_cleanup import cleanup_stale_pending_properties # Added import
+from app.services.notification_outbox import dispatch_notification_outbox
+from app.services.payment_jobs import payment_job_queue
+from app.services.metrics import get_listing_metrics, refresh_metrics_snapshot
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from app.dependencies.database import get_db
+from app.dependencies.database import get_db, pool_stats
 from app.models.property import Property, PropertyStatus, PaymentStatus
 from app.schemas.property import MetricsResponse, PropertyListResponse
-from decimal import Decimal
-from typing import List
+from app.services.listing_cache import cached_json_response
+from app.utils.conditional import row_validators
+from app.utils.object_storage import shutdown_object_storage
+from app.utils.image_processing import shutdown_image_processing
+from app.utils.upload_validation import RequestSizeLimitMiddleware
+from app.services.http_clients import http_clients
+from app.utils.cache import cache_stats
+from typing import List, Optional
 
 configure_logging()
 logger = structlog.get_logger(__name__)
 
 app = FastAPI(title="Property Listing Microservice")
 
+# Oversized uploads are refused before the multipart body is spooled. Added
+# before CORS so the 413 still carries CORS headers.
+app.add_middleware(RequestSizeLimitMiddleware)
+
 # CORS Middleware
 # origins = [origin.strip() for origin in settings.CORS_ORIGINS.split(",")]
 origins = ["*"]
@@ -42,15 +55,28 @@ async def startup():
     redis_connection = redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
     await FastAPILimiter.init(redis_connection)
 
+    # Pooled clients for the user, payment, notification and geocoding services
+    http_clients.start()
+
     # Schedule background tasks
     scheduler.add_job(cleanup_stale_pending_properties, "interval", days=1) # Run daily
+    scheduler.add_job(dispatch_notification_outbox, "interval", seconds=settings.NOTIFICATION_OUTBOX_INTERVAL_SECONDS)
+    if settings.METRICS_SNAPSHOT_ENABLED:
+        scheduler.add_job(refresh_metrics_snapshot, "interval", seconds=settings.METRICS_SNAPSHOT_INTERVAL_SECONDS)
     scheduler.start()
+    # Workers for approve-and-pay?async=true
+    payment_job_queue.start()
     logger.info("Scheduler started")
 
 @app.on_event("shutdown")
 async def shutdown():
     scheduler.shutdown()
     logger.info("Scheduler shut down")
+    shutdown_object_storage()
+    shutdown_image_processing()
+    # Stop payment jobs while the HTTP clients are still open
+    await payment_job_queue.stop()
+    await http_clients.aclose()
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -70,30 +96,31 @@ public_router = APIRouter()
 # Public endpoint for reserved properties
 @public_router.get("/properties/reserved", response_model=PropertyListResponse, include_in_schema=True)
 async def get_reserved_properties(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Retrieves all reserved properties with total count.
-    This endpoint is publicly accessible.
+    This endpoint is publicly accessible and served from the listing cache.
     """
-    # Get total count of reserved properties
-    total = await db.scalar(
-        select(func.count(Property.id))
-        .where(Property.status == PropertyStatus.RESERVED)
-    )
-    
-    # Get all reserved properties
-    result = await db.execute(
-        select(Property)
-        .where(Property.status == PropertyStatus.RESERVED)
-        .order_by(Property.created_at.desc())
-    )
-    items = result.scalars().all()
-    
-    return {
-        "total": total or 0,
-        "items": items
-    }
+    async def build():
+        # Get total count of reserved properties
+        total = await db.scalar(
+            select(func.count(Property.id))
+            .where(Property.status == PropertyStatus.RESERVED)
+        )
+        
+        # Get all reserved properties
+        result = await db.execute(
+            select(Property)
+            .where(Property.status == PropertyStatus.RESERVED)
+            .order_by(Property.created_at.desc())
+        )
+        items = result.scalars().all()
+        
+        return {"total": total or 0, "items": items}, row_validators(items, "reserved", total)
+
+    return await cached_json_response("reserved", {}, build, PropertyListResponse, if_none_match=if_none_match)
 
 # Include the public router first (no prefix to avoid /api/v1/api/v1)
 app.include_router(public_router, prefix="/api/v1", tags=["Public"])
@@ -119,19 +146,16 @@ def health_check():
 @app.get("/api/v1/metrics", response_model=MetricsResponse)
 async def service_metrics(db: AsyncSession = Depends(get_db)):
     """Top-level service metrics for listing counts."""
-    total_listings = await db.scalar(select(func.count(Property.id)))
-    pending = await db.scalar(select(func.count(Property.id)).where(Property.status == PropertyStatus.PENDING))
-    approved = await db.scalar(select(func.count(Property.id)).where(Property.status == PropertyStatus.APPROVED))
-    rejected = await db.scalar(select(func.count(Property.id)).where(Property.status == PropertyStatus.REJECTED))
-    total_revenue = await db.scalar(
-        select(func.coalesce(func.sum(Property.price), 0)).where(
-            Property.payment_status.in_([PaymentStatus.SUCCESS, PaymentStatus.PAID])
-        )
-    )
-    return MetricsResponse(
-        total_listings=total_listings or 0,
-        pending=pending or 0,
-        approved=approved or 0,
-        rejected=rejected or 0,
-        total_revenue=total_revenue if total_revenue is not None else Decimal("0")
-    )
+    return MetricsResponse(**await get_listing_metrics(db))
+
+
+@app.get("/api/v1/metrics/cache")
+async def service_cache_metrics():
+    """Hit ratios of this worker's in-process caches."""
+    return cache_stats()
+
+
+@app.get("/api/v1/metrics/db-pool")
+async def service_db_pool_metrics():
+    """Database connection pool usage of this worker."""
+    return pool_stats()
@@ -0,0 +1,43 @@
+import enum
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Enum, Index, Integer, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func, text
+
+from app.models.property import Base
+
+
+class OutboxStatus(enum.Enum):
+    PENDING = "PENDING"
+    SENT = "SENT"
+    FAILED = "FAILED" # Gave up after NOTIFICATION_OUTBOX_MAX_ATTEMPTS
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+class NotificationOutbox(Base):
+    """
+    Owner notifications waiting to be delivered. Rows are written in the same
+    transaction as the status change they announce and sent by the outbox dispatcher.
+    """
+    __tablename__ = 'notification_outbox'
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    message = Column(Text, nullable=False)
+    status = Column(Enum(OutboxStatus, native_enum=False), nullable=False, default=OutboxStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    # Earliest time the dispatcher may (re)try the row; also the lease of a claimed row
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # The dispatcher only ever scans rows that are still due
+        Index('idx_notification_outbox_pending_next_attempt', next_attempt_at, postgresql_where=text("status = 'PENDING'")),
+    )
@@ -5,7 +5,7 @@ from sqlalchemy.dialects.postgresql import UUID, TSVECTOR # Added TSVECTOR
 from sqlalchemy.ext.declarative import declarative_base
 import uuid
 from datetime import datetime # Added datetime
-from sqlalchemy.sql import func # Added func for server_default
+from sqlalchemy.sql import func, text # Added func for server_default
 
 Base = declarative_base()
 
@@ -18,6 +18,7 @@ class PropertyStatus(enum.Enum):
 
 class PaymentStatus(enum.Enum): # New Enum for payment status
     PENDING = "PENDING"
+    INITIATING = "INITIATING" # Claimed by an approve-and-pay request calling the payment service
     SUCCESS = "SUCCESS"
     FAILED = "FAILED"
     PAID = "PAID"
@@ -35,9 +36,15 @@ class Property(Base):
     house_type = Column(String(50), nullable=False, default='private home') # Changed to house_type
     amenities = Column(JSON, default=[])
     photos = Column(JSON, default=[])
+    photo_variants = Column(JSON, default=[]) # Per photo, {width: url} of its resized copies
     status = Column(Enum(PropertyStatus, native_enum=False), nullable=False, default=PropertyStatus.PENDING)
     payment_status = Column(Enum(PaymentStatus, native_enum=False), nullable=False, default=PaymentStatus.PENDING) # New payment status
     approval_timestamp = Column(DateTime, nullable=True) # New approval timestamp
+    # Idempotency key sent to the payment service; reused until a payment is recorded
+    payment_request_id = Column(UUID(as_uuid=True), nullable=True)
+    payment_initiated_at = Column(DateTime(timezone=True), nullable=True) # When the current claim was taken
+    payment_tx_ref = Column(String(255), nullable=True)
+    payment_checkout_url = Column(Text, nullable=True)
     lat = Column(Float, nullable=True) # Added lat
     lon = Column(Float, nullable=True) # Added lon
     bedrooms = Column(Integer, nullable=True) # Added bedrooms
@@ -47,6 +54,16 @@ class Property(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False) # Added updated_at
     fts = Column(TSVECTOR, nullable=True) # Added fts for full-text search
 
+    @property
+    def thumbnail_url(self):
+        """The smallest variant of the first photo, falling back to the photo itself."""
+        if not self.photos:
+            return None
+        variants = (self.photo_variants or [{}])[0]
+        if variants:
+            return variants[min(variants, key=int)]
+        return self.photos[0]
+
     __table_args__ = (
         Index('idx_properties_user_id', user_id),
         Index('idx_properties_status', status),
@@ -54,4 +71,9 @@ class Property(Base):
         Index('idx_properties_price', price),
         Index('idx_properties_lat_lon', func.ll_to_earth(lat, lon), postgresql_using='gist'), # For earthdistance
         Index('fts_idx', fts, postgresql_using='gin'), # For full-text search
+        # Keyset pagination sort keys for the public listing endpoints
+        Index('idx_properties_approved_created_at_id', created_at, id, postgresql_where=text("status = 'APPROVED'")),
+        Index('idx_properties_approved_price_id', price, id, postgresql_where=text("status = 'APPROVED'")),
+        # Oldest-first scan of unpaid listings by the stale listing cleanup
+        Index('idx_properties_pending_payment_created_at', created_at, postgresql_where=text("payment_status = 'PENDING'")),
     )
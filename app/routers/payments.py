@@ -1,20 +1,58 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 import structlog
-from sqlalchemy import select # Added import
+from sqlalchemy import func, or_, select, update
 from datetime import datetime # Added datetime
 
 from app.dependencies.database import get_db
 from app.dependencies.security import get_api_key
 from app.models.property import Property, PropertyStatus, PaymentStatus # Added PaymentStatus
-from app.schemas.property import PaymentConfirmation, PropertyResponse, PaymentStatusEnum # Added PaymentStatusEnum
-from app.services.notification import send_notification, get_approval_message
+from app.schemas.property import PaymentConfirmation, PaymentStatusEnum # Added PaymentStatusEnum
+from app.services.notification import get_approval_message
+from app.services.notification_outbox import enqueue_notification
+from app.services.listing_cache import invalidate_listing_cache
 from app.config import settings # Added settings
 
 logger = structlog.get_logger(__name__)
 
 router = APIRouter()
 
+async def _current_payment_state(db: AsyncSession, payload: PaymentConfirmation) -> dict:
+    """Answer for a webhook that changed nothing: unknown property, replay, or another payment."""
+    result = await db.execute(
+        select(Property.status, Property.payment_status, Property.payment_id).where(Property.id == payload.property_id)
+    )
+    prop = result.one_or_none()
+    if prop is None:
+        logger.warning(
+            "Property not found for payment confirmation",
+            property_id=str(payload.property_id),
+            payment_id=str(payload.payment_id),
+        )
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found",
+        )
+
+    state = {"property_status": prop.status.value, "payment_status": prop.payment_status.value}
+    if prop.payment_id is not None and prop.payment_id != payload.payment_id:
+        logger.warning(
+            "Payment confirmation for a different payment ignored",
+            property_id=str(payload.property_id),
+            payment_id=str(payload.payment_id),
+            current_payment_id=str(prop.payment_id),
+        )
+        return {"status": "ignored", **state}
+    if prop.payment_status in (PaymentStatus.SUCCESS, PaymentStatus.FAILED):
+        logger.info(
+            "Payment already processed for property",
+            property_id=str(payload.property_id),
+            current_payment_status=prop.payment_status.value,
+        )
+        return {"status": "already_processed", **state}
+    return {"status": "received", **state}
+
+
 @router.post("/payments/confirm", status_code=status.HTTP_200_OK)
 async def payment_confirmation_webhook(
     payload: PaymentConfirmation,
@@ -23,7 +61,8 @@ async def payment_confirmation_webhook(
 ):
     """
     Webhook to receive payment confirmation from the Payment Processing Service.
-    Ensures idempotency and updates property status.
+    The status change is a single conditional UPDATE, so duplicate and concurrent
+    deliveries for the same payment are applied once and answered `already_processed`.
     """
     logger.info("Payment confirmation webhook received", data=payload.model_dump(mode='json'))
     
@@ -36,76 +75,71 @@ async def payment_confirmation_webhook(
         )
 
     try:
-        result = await db.execute(
-            select(Property).filter(Property.id == payload.property_id)
-        )
-        prop = result.scalar_one_or_none()
-
-        if not prop:
+        values = {
+            # Keep what initiation recorded; fill it in if this webhook beat it
+            "payment_id": func.coalesce(Property.payment_id, payload.payment_id),
+            "payment_tx_ref": func.coalesce(Property.payment_tx_ref, payload.tx_ref),
+        }
+        if payload.status == PaymentStatusEnum.SUCCESS.value:
+            values.update(
+                payment_status=PaymentStatus.SUCCESS,
+                status=PropertyStatus.APPROVED, # Approve the property
+                approval_timestamp=datetime.utcnow(), # Set approval timestamp
+            )
+        elif payload.status == PaymentStatusEnum.FAILED.value:
+            # Optionally, set PropertyStatus to REJECTED or keep PENDING based on business logic
+            # For now, we'll keep it PENDING if payment failed, awaiting user action or timeout
+            values["payment_status"] = PaymentStatus.FAILED
+        else:
             logger.warning(
-                "Property not found for payment confirmation",
+                "Payment confirmation received with unknown status",
                 property_id=str(payload.property_id),
-                payment_id=str(payload.payment_id),
-            )
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Property not found",
+                payment_status=payload.status,
             )
+            return await _current_payment_state(db, payload)
 
-        logger.info("Retrieved property for payment confirmation", property_data=PropertyResponse.from_orm(prop).model_dump(mode='json'))
-        
-        # Idempotency check: If payment status is already SUCCESS or FAILED, do nothing.
-        if prop.payment_status == PaymentStatus.SUCCESS or prop.payment_status == PaymentStatus.FAILED:
-            logger.info(
-                "Payment already processed for property",
-                property_id=str(prop.id),
-                current_payment_status=prop.payment_status.value,
+        # One conditional UPDATE is the idempotency check: concurrent or replayed
+        # deliveries of a payment that was already settled match no row
+        result = await db.execute(
+            update(Property)
+            .where(
+                Property.id == payload.property_id,
+                Property.payment_status.not_in([PaymentStatus.SUCCESS, PaymentStatus.FAILED]),
+                or_(Property.payment_id.is_(None), Property.payment_id == payload.payment_id),
             )
-            return {"status": "already_processed"}
-
-        # Update payment_status based on payload status
-        if payload.status == PaymentStatusEnum.SUCCESS.value:
-            prop.payment_status = PaymentStatus.SUCCESS
-            prop.status = PropertyStatus.APPROVED # Approve the property
-            prop.approval_timestamp = datetime.utcnow() # Set approval timestamp
-            logger.info("Property payment successful and approved", property_id=str(prop.id))
+            .values(**values)
+            .returning(Property.user_id, Property.title, Property.location, Property.status, Property.payment_status)
+            .execution_options(synchronize_session=False)
+        )
+        prop = result.one_or_none()
+        if prop is None:
+            await db.rollback()
+            return await _current_payment_state(db, payload)
 
-            # Send notification to the property owner
-            try:
-                # Fetch user data to get preferred language if needed, or default to English
-                # For now, defaulting to English and using fixed payment details from settings
-                message = get_approval_message(
-                    "en", # Assuming English for now, can be dynamic
-                    title=prop.title,
-                    location=prop.location,
-                    payment_amount=settings.PAYMENT_AMOUNT,
-                    payment_currency=settings.PAYMENT_CURRENCY
-                )
-                await send_notification(str(prop.user_id), message)
-                logger.info("Approval notification sent", user_id=str(prop.user_id))
-            except Exception as e:
-                logger.error("Failed to send notification", property_id=str(prop.id), error=str(e), exc_info=True)
+        if prop.payment_status == PaymentStatus.SUCCESS:
+            logger.info("Property payment successful and approved", property_id=str(payload.property_id))
 
-        elif payload.status == PaymentStatusEnum.FAILED.value:
-            prop.payment_status = PaymentStatus.FAILED
-            # Optionally, set PropertyStatus to REJECTED or keep PENDING based on business logic
-            # For now, we'll keep it PENDING if payment failed, awaiting user action or timeout
+            # Queued in this transaction and sent by the outbox dispatcher after commit
+            # For now, defaulting to English and using fixed payment details from settings
+            message = get_approval_message(
+                "en", # Assuming English for now, can be dynamic
+                title=prop.title,
+                location=prop.location,
+                payment_amount=settings.PAYMENT_AMOUNT,
+                payment_currency=settings.PAYMENT_CURRENCY
+            )
+            enqueue_notification(db, prop.user_id, message)
+        else:
             logger.warning(
                 "Payment failed for property",
-                property_id=str(prop.id),
+                property_id=str(payload.property_id),
                 payment_status=payload.status,
                 tx_ref=payload.tx_ref,
                 error_message=payload.error_message,
             )
-        else:
-            logger.warning(
-                "Payment confirmation received with unknown status",
-                property_id=str(prop.id),
-                payment_status=payload.status,
-            )
-        
+
         await db.commit()
-        await db.refresh(prop)
+        await invalidate_listing_cache()
 
         return {"status": "received", "property_status": prop.status.value, "payment_status": prop.payment_status.value}
     except HTTPException as http_exc:
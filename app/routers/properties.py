@@ -1,52 +1,298 @@
 import asyncio
-from fastapi import APIRouter, Depends, HTTPException, status, Query, File, UploadFile, Form
+import time
+from fastapi import APIRouter, Depends, HTTPException, status, Query, File, UploadFile, Form, Header, Response
+from fastapi.responses import JSONResponse
 # import shutil # Removed shutil
 from sqlalchemy.ext.asyncio import AsyncSession
 import structlog
-import httpx
 from app.dependencies.database import get_db
 from app.dependencies.auth import get_current_owner, get_current_user, oauth2_scheme
 from app.models.property import Property, PropertyStatus, PaymentStatus # Added PaymentStatus
 from app.schemas.property import (
     PropertySubmit, PropertySubmitResponse, 
     PropertyResponse, PropertyPublicResponse, HouseType, PaymentStatusEnum, PropertyUpdate, 
-    PaymentInitiationResponse, MetricsResponse, PropertyListResponse, PropertyOwnerContactResponse
+    PaymentInitiationResponse, PaymentJobResponse, MetricsResponse, PropertyListResponse, PropertyOwnerContactResponse,
+    ListingSort
 )
 from app.services.gebeta import geocode_location_with_fallback
-from app.services.payment_service import initiate_payment
-from app.services.user_service import get_user_by_id
+from app.services.payment_jobs import (
+    JOB_QUEUED, PaymentJob, PaymentJobQueueUnavailable, get_payment_job, payment_job_queue
+)
+from app.services.payment_initiation import (
+    claim_payment_initiation, existing_payment_initiation, initiate_claimed_payment, record_payment_initiation,
+    release_payment_claim
+)
+from app.services.user_service import get_owner_profile
+from app.utils.circuit_breaker import CircuitOpenError
+from app.services.metrics import get_listing_metrics
+from app.services.listing_cache import cached_json_response, invalidate_listing_cache, normalize_params
 from uuid import UUID
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from decimal import Decimal
 from datetime import datetime # Added datetime
 
-from sqlalchemy import func, text, select
-from app.utils.object_storage import upload_file_to_object_storage
+from sqlalchemy import Float, func, text, select
+from redis.exceptions import RedisError
+from app.utils.upload_validation import FileTooLargeError, UnsupportedFileTypeError, UploadRejectedError
+from app.utils.object_storage import (
+    PhotoUploadError, StoredPhoto, delete_files_quietly, upload_photos_to_object_storage
+)
+from app.utils.pagination import (
+    CURSOR_NEXT, CURSOR_PREV, InvalidCursorError, apply_keyset, decode_cursor, encode_cursor,
+    estimate_row_count
+)
+from app.utils.conditional import is_not_modified, not_modified_response, row_validators
+from app.utils.geo import distance_km, parse_bbox, within_bbox, within_radius
 from app.config import settings # Added settings
 
 logger = structlog.get_logger(__name__)
 
 router = APIRouter()
 
+# Sort key columns and direction for each listing sort. The trailing `id` makes every
+# key unique so keyset pages never skip or repeat rows; each key is backed by a
+# composite partial index on approved listings.
+LISTING_SORT_KEYS = {
+    ListingSort.NEWEST: ((Property.created_at, Property.id), True),
+    ListingSort.PRICE_ASC: ((Property.price, Property.id), False),
+    ListingSort.PRICE_DESC: ((Property.price, Property.id), True),
+}
+
+def _search_tsquery(search: str):
+    # websearch_to_tsquery accepts free-form input ("2 bed -studio", quoted phrases)
+    # without raising tsquery syntax errors
+    return func.websearch_to_tsquery('english', search)
+
+def _search_columns(
+    db: AsyncSession,
+    sort: ListingSort,
+    search: Optional[str] = None,
+    highlight: bool = False
+):
+    """
+    Returns the labelled relevance rank and snippet expressions for a search.
+    Both need the stored tsvector, so none are produced on SQLite.
+    """
+    if sort == ListingSort.RELEVANCE and not search:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="sort=relevance requires search")
+    if not search or db.bind.dialect.name == "sqlite":
+        return []
+
+    columns = []
+    if sort == ListingSort.RELEVANCE:
+        columns.append(func.ts_rank_cd(Property.fts, _search_tsquery(search), type_=Float).label("search_rank"))
+    if highlight:
+        columns.append(func.ts_headline(
+            'english', Property.description, _search_tsquery(search),
+            'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=10'
+        ).label("snippet"))
+    return columns
+
+def _apply_listing_filters(
+    query,
+    db: AsyncSession,
+    location: Optional[str] = None,
+    min_price: Optional[Decimal] = None,
+    max_price: Optional[Decimal] = None,
+    amenities: Optional[List[str]] = None,
+    search: Optional[str] = None
+):
+    """
+    Applies the shared listing filters to `query`. Used by every listing endpoint
+    so the page query and any count or estimate are built from the same conditions.
+    """
+    if search and db.bind.dialect.name != "sqlite":
+        # Matches the trigger-maintained fts column so the fts_idx GIN index is used
+        query = query.where(Property.fts.op("@@")(_search_tsquery(search)))
+    if location:
+        query = query.where(Property.location.ilike(f"%{location}%"))
+    if min_price:
+        query = query.where(Property.price >= min_price)
+    if max_price:
+        query = query.where(Property.price <= max_price)
+    if amenities:
+        # Ensure amenities are treated as an array in the query
+        query = query.where(Property.amenities.op('&&')(amenities))
+    return query
+
+def _apply_geo_filters(
+    query,
+    db: AsyncSession,
+    sort: ListingSort,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    radius_km: Optional[float] = None,
+    bbox: Optional[str] = None
+):
+    """
+    Applies the radius / bounding-box filters to `query`.
+
+    Returns (query, extra_columns) where `extra_columns` holds a labelled distance_km
+    expression when a reference point was given.
+    """
+    if (lat is None) != (lon is None):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="lat and lon must be provided together")
+    if lat is None and (radius_km is not None or sort == ListingSort.DISTANCE):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="radius_km and sort=distance require lat and lon")
+
+    dialect_name = db.bind.dialect.name
+    distance = None
+    if lat is not None:
+        distance = distance_km(dialect_name, Property.lat, Property.lon, lat, lon).label("distance_km")
+        # Rows without coordinates have no distance and cannot take part in a distance sort key
+        query = query.where(Property.lat.isnot(None), Property.lon.isnot(None))
+    if radius_km is not None:
+        query = query.where(within_radius(dialect_name, Property.lat, Property.lon, lat, lon, radius_km))
+    if bbox:
+        try:
+            min_lon, min_lat, max_lon, max_lat = parse_bbox(bbox)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid bbox: {e}")
+        query = query.where(within_bbox(dialect_name, Property.lat, Property.lon, min_lon, min_lat, max_lon, max_lat))
+    return query, [distance] if distance is not None else []
+
+async def _fetch_listing_page(
+    db: AsyncSession,
+    query,
+    sort: ListingSort,
+    cursor: Optional[str],
+    offset: int,
+    limit: int,
+    with_total: bool = False,
+    extra_columns=(),
+    origin: Optional[Tuple[float, float]] = None
+):
+    """
+    Executes a listing query with a stable ORDER BY and returns
+    (items, total, next_cursor, prev_cursor).
+
+    With a cursor the page is located by seeking on the sort key, so deep pages cost
+    the same as the first one. Without a cursor the legacy offset is honoured.
+    When `with_total` is set the exact match count is fetched in the same round trip;
+    otherwise `total` is None. Each labelled expression in `extra_columns` (distance,
+    rank, snippet) is selected alongside the row and set on the item under its label.
+    Distance cursors are bound to `origin`, the (lat, lon) the distances are measured from.
+    """
+    extras = {column.key: column for column in extra_columns}
+    if sort != ListingSort.DISTANCE:
+        origin = None
+    if sort == ListingSort.DISTANCE:
+        columns, descending = (extras["distance_km"], Property.id), False
+    elif sort == ListingSort.RELEVANCE and "search_rank" in extras:
+        columns, descending = (extras["search_rank"], Property.id), True
+    else:
+        # Relevance without a stored tsvector (SQLite) degrades to newest first
+        columns, descending = LISTING_SORT_KEYS.get(sort, LISTING_SORT_KEYS[ListingSort.NEWEST])
+    values, direction = None, CURSOR_NEXT
+    if cursor:
+        try:
+            values, direction = decode_cursor(
+                cursor, sort.value, [column.type.python_type for column in columns], origin
+            )
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid cursor: {e}")
+
+    filtered_query = query
+    if with_total:
+        if values is None:
+            # The window runs after WHERE and before LIMIT/OFFSET, so it sees every match
+            total_column = func.count().over()
+        else:
+            # The seek predicate would shrink a window count, so count the unseeked filter instead
+            total_column = select(func.count()).select_from(filtered_query.subquery()).scalar_subquery()
+        query = query.add_columns(total_column.label("total"))
+    if extra_columns:
+        query = query.add_columns(*extra_columns)
+
+    query = apply_keyset(query, columns, descending, values, direction)
+    if values is None and offset:
+        query = query.offset(offset)
+
+    # Fetch one extra row to learn whether another page exists
+    result = await db.execute(query.limit(limit + 1))
+    rows = result.all()
+    items = [row[0] for row in rows]
+    for item, row in zip(items, rows):
+        for key in extras:
+            setattr(item, key, row._mapping[key])
+    total = None
+    if with_total:
+        if rows:
+            total = rows[0].total
+        elif values is None and not offset:
+            total = 0
+        else:
+            # Paged past the end; only this rare case pays for a separate count
+            total = await db.scalar(select(func.count()).select_from(filtered_query.subquery()))
+
+    has_more = len(items) > limit
+    items = items[:limit]
+    if direction == CURSOR_PREV:
+        items.reverse()
+
+    if not items:
+        return items, total, None, None
+
+    def key_of(item):
+        return [getattr(item, column.key) for column in columns]
+
+    if direction == CURSOR_NEXT:
+        has_next, has_prev = has_more, values is not None or offset > 0
+    else:
+        has_next, has_prev = True, has_more
+
+    next_cursor = encode_cursor(sort.value, key_of(items[-1]), CURSOR_NEXT, origin) if has_next else None
+    prev_cursor = encode_cursor(sort.value, key_of(items[0]), CURSOR_PREV, origin) if has_prev else None
+    return items, total, next_cursor, prev_cursor
+
+async def _timed_stage(stage: str, awaitable):
+    """Awaits `awaitable` and logs how long the named submit stage took."""
+    started = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        logger.info("submit_stage_timing", stage=stage, duration_ms=round((time.perf_counter() - started) * 1000, 1))
+
+def _collect_photos(file: Optional[UploadFile], files: Optional[List[UploadFile]], existing: int = 0) -> List[UploadFile]:
+    photos = ([file] if file else []) + list(files or [])
+    if not photos:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="At least one photo is required")
+    if existing + len(photos) > settings.MAX_PHOTOS_PER_PROPERTY:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A property can have at most {settings.MAX_PHOTOS_PER_PROPERTY} photos"
+        )
+    return photos
+
+def _upload_error_status(errors: List[Exception]) -> int:
+    """Client errors are reported as such; anything else is a storage failure."""
+    for error_type, status_code in (
+        (FileTooLargeError, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE),
+        (UnsupportedFileTypeError, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE),
+        (UploadRejectedError, status.HTTP_400_BAD_REQUEST),
+    ):
+        if all(isinstance(e, error_type) for e in errors):
+            return status_code
+    return status.HTTP_502_BAD_GATEWAY
+
+async def _upload_photos(photos: List[UploadFile]) -> List[StoredPhoto]:
+    """Uploads photos concurrently; a partial failure is reported per file."""
+    try:
+        return await upload_photos_to_object_storage(photos)
+    except PhotoUploadError as e:
+        logger.error("Photo upload failed", failures=e.failures, uploaded_count=e.uploaded_count)
+        raise HTTPException(
+            status_code=_upload_error_status(e.errors),
+            detail={"message": "Some photos could not be uploaded; none were saved", "failed": e.failures}
+        )
+
+def _photo_urls(stored: List[StoredPhoto]) -> List[str]:
+    return [url for photo in stored for url in photo.all_urls()]
+
 @router.get("/metrics", response_model=MetricsResponse)
 async def get_metrics(db: AsyncSession = Depends(get_db)):
     logger.info("metrics_accessed", endpoint="metrics", service="property")
-    total_listings = await db.scalar(select(func.count(Property.id)))
-    pending = await db.scalar(select(func.count(Property.id)).where(Property.status == PropertyStatus.PENDING))
-    approved = await db.scalar(select(func.count(Property.id)).where(Property.status == PropertyStatus.APPROVED))
-    rejected = await db.scalar(select(func.count(Property.id)).where(Property.status == PropertyStatus.REJECTED))
-    total_revenue = await db.scalar(
-        select(func.coalesce(func.sum(Property.price), 0)).where(
-            Property.payment_status.in_([PaymentStatus.SUCCESS, PaymentStatus.PAID])
-        )
-    )
-    return {
-        "total_listings": total_listings,
-        "pending": pending,
-        "approved": approved,
-        "rejected": rejected,
-        "total_revenue": total_revenue
-    }
+    return await get_listing_metrics(db)
 
 @router.post("/submit", status_code=status.HTTP_201_CREATED, response_model=PropertySubmitResponse)
 async def submit_property(
@@ -56,7 +302,8 @@ async def submit_property(
     price: Decimal = Form(...),
     house_type: HouseType = Form(...),
     amenities: List[str] = Form(...),
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    files: Optional[List[UploadFile]] = File(None),
     bedrooms: Optional[int] = Form(None),
     bathrooms: Optional[int] = Form(None),
     area_sqm: Optional[float] = Form(None),
@@ -65,8 +312,21 @@ async def submit_property(
 ):
     current_user = current_owner_data["user"]
     access_token = current_owner_data["token"]
-    image_url = await upload_file_to_object_storage(file)
-    geocoded_data = await geocode_location_with_fallback(location)
+    photos = _collect_photos(file, files)
+    started = time.perf_counter()
+
+    # Upload and geocoding are independent, so run them concurrently
+    upload_task = asyncio.create_task(_timed_stage("upload", _upload_photos(photos)))
+    geocode_task = asyncio.create_task(_timed_stage("geocode", geocode_location_with_fallback(location)))
+    try:
+        stored_photos, geocoded_data = await asyncio.gather(upload_task, geocode_task)
+    except BaseException:
+        # Stop geocoding, but let a running upload settle so its object can be removed
+        geocode_task.cancel()
+        await asyncio.gather(upload_task, geocode_task, return_exceptions=True)
+        if not upload_task.cancelled() and upload_task.exception() is None:
+            await delete_files_quietly(_photo_urls(upload_task.result()))
+        raise
 
     new_property = Property(
         user_id=UUID(current_user['user_id']),
@@ -76,7 +336,8 @@ async def submit_property(
         price=price,
         house_type=house_type,
         amenities=amenities,
-        photos=[image_url],
+        photos=[photo.url for photo in stored_photos],
+        photo_variants=[photo.variants for photo in stored_photos],
         lat=geocoded_data["lat"],
         lon=geocoded_data["lon"],
         bedrooms=bedrooms,
@@ -85,9 +346,16 @@ async def submit_property(
         payment_status=PaymentStatus.PENDING # Set initial payment status
     )
     db.add(new_property)
-    await db.commit()
+    try:
+        await _timed_stage("db_insert", db.commit())
+    except Exception:
+        await db.rollback()
+        await delete_files_quietly(_photo_urls(stored_photos))
+        raise
+    await invalidate_listing_cache()
     await db.refresh(new_property)
 
+    logger.info("submit_stage_timing", stage="total", duration_ms=round((time.perf_counter() - started) * 1000, 1))
     return {
         "property_id": new_property.id,
         "status": new_property.status.value,
@@ -113,11 +381,70 @@ async def get_my_properties(
     return properties
 
 
+# Declared before /{id} so that "public" is not captured as a property id
+@router.get("/public", response_model=List[PropertyPublicResponse])
+async def get_all_properties_public(
+    db: AsyncSession = Depends(get_db),
+    location: Optional[str] = None,
+    min_price: Optional[Decimal] = None,
+    max_price: Optional[Decimal] = None,
+    amenities: Optional[List[str]] = Query(None),
+    search: Optional[str] = None,
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0, le=500),
+    bbox: Optional[str] = None,
+    sort: ListingSort = ListingSort.NEWEST,
+    highlight: bool = False,
+    cursor: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Public, non-auth endpoint to list approved properties with full details.
+    Supports basic filters and pagination. Only returns APPROVED listings.
+    The body stays a plain list, so page cursors are returned in the
+    X-Next-Cursor / X-Prev-Cursor headers. Responses are served from the listing cache.
+    """
+    params = {
+        "location": location, "min_price": min_price, "max_price": max_price,
+        "amenities": amenities, "search": search, "lat": lat, "lon": lon,
+        "radius_km": radius_km, "bbox": bbox, "sort": sort, "highlight": highlight,
+        "cursor": cursor, "offset": offset, "limit": limit,
+    }
+
+    async def build():
+        query = _apply_listing_filters(
+            select(Property).where(Property.status == PropertyStatus.APPROVED),
+            db, location, min_price, max_price, amenities, search
+        )
+        query, extra_columns = _apply_geo_filters(query, db, sort, lat, lon, radius_km, bbox)
+        extra_columns += _search_columns(db, sort, search, highlight)
+
+        items, _, next_cursor, prev_cursor = await _fetch_listing_page(
+            db, query, sort, cursor, offset, limit, extra_columns=extra_columns, origin=(lat, lon)
+        )
+        headers = row_validators(items, "public_list", normalize_params(params, ("location", "search")))
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        if prev_cursor:
+            headers["X-Prev-Cursor"] = prev_cursor
+        return items, headers
+
+    return await cached_json_response(
+        "public_list", params, build, List[PropertyPublicResponse],
+        if_none_match=if_none_match, case_insensitive=("location", "search")
+    )
+
 @router.get("/{id}", response_model=PropertyResponse)
 async def get_property(
     id: UUID, 
+    response: Response,
     db: AsyncSession = Depends(get_db), 
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None)
 ):
     prop = await db.get(Property, id)
     if not prop:
@@ -127,64 +454,89 @@ async def get_property(
     if str(prop.user_id) != current_user['user_id'] and current_user['role'].lower() != 'admin': # Ensure comparison is correct
         raise HTTPException(status_code=403, detail="Not authorized to view this property")
 
+    validators = row_validators([prop])
+    if is_not_modified(validators["ETag"], prop.updated_at, if_none_match, if_modified_since):
+        return not_modified_response(validators)
+    response.headers.update(validators)
     return prop
 
 
 @router.get("", response_model=PropertyListResponse)
 async def get_all_properties(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     location: Optional[str] = None,
     min_price: Optional[Decimal] = None,
     max_price: Optional[Decimal] = None,
     amenities: Optional[List[str]] = Query(None),
     search: Optional[str] = None,
-    offset: int = 0,
-    limit: int = 20
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0, le=500),
+    bbox: Optional[str] = None,
+    sort: ListingSort = ListingSort.NEWEST,
+    highlight: bool = False,
+    cursor: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    exact_total: bool = True,
+    if_none_match: Optional[str] = Header(None)
 ):
-    query = select(Property).where(Property.status == PropertyStatus.APPROVED)
-
-    if search and db.bind.dialect.name != "sqlite":
-        query = query.where(text("to_tsvector('english', title || ' ' || description) @@ to_tsquery('english', :search_query)").bindparams(search_query=search))
-    if location:
-        query = query.where(Property.location.ilike(f"%{location}%"))
-    if min_price:
-        query = query.where(Property.price >= min_price)
-    if max_price:
-        query = query.where(Property.price <= max_price)
-    if amenities:
-        # Ensure amenities are treated as an array in the query
-        query = query.where(Property.amenities.op('&&')(amenities))
-
-    # Compute total count without pagination
-    count_query = select(func.count(Property.id)).where(Property.status == PropertyStatus.APPROVED)
-    if search and db.bind.dialect.name != "sqlite":
-        count_query = count_query.where(text("to_tsvector('english', title || ' ' || description) @@ to_tsquery('english', :search_query)").bindparams(search_query=search))
-    if location:
-        count_query = count_query.where(Property.location.ilike(f"%{location}%"))
-    if min_price:
-        count_query = count_query.where(Property.price >= min_price)
-    if max_price:
-        count_query = count_query.where(Property.price <= max_price)
-    if amenities:
-        count_query = count_query.where(Property.amenities.op('&&')(amenities))
-
-    total = await db.scalar(count_query)
-
-    # Fetch paginated items
-    query = query.offset(offset).limit(limit)
-    result = await db.execute(query)
-    items = result.scalars().all()
-    return {"total": total or 0, "items": items}
+    """
+    Lists approved properties with a total match count.
+    The page and the count share one round trip; `exact_total=false` skips counting
+    entirely for infinite-scroll clients, and in "estimated" total mode large result
+    sets report the planner's row estimate instead of an exact count.
+    """
+    query = _apply_listing_filters(
+        select(Property).where(Property.status == PropertyStatus.APPROVED),
+        db, location, min_price, max_price, amenities, search
+    )
+    query, extra_columns = _apply_geo_filters(query, db, sort, lat, lon, radius_km, bbox)
+    extra_columns += _search_columns(db, sort, search, highlight)
+
+    estimated_total = None
+    if exact_total and settings.LISTING_TOTAL_MODE == "estimated":
+        estimated_total = await estimate_row_count(db, query.with_only_columns(Property.id))
+        if estimated_total is not None and estimated_total < settings.LISTING_ESTIMATE_THRESHOLD:
+            estimated_total = None
+
+    # Fetch paginated items, with the exact count folded into the same query when needed
+    items, total, next_cursor, prev_cursor = await _fetch_listing_page(
+        db, query, sort, cursor, offset, limit,
+        with_total=exact_total and estimated_total is None, extra_columns=extra_columns, origin=(lat, lon)
+    )
+    if estimated_total is not None:
+        total = estimated_total
+
+    params = {
+        "location": location, "min_price": min_price, "max_price": max_price,
+        "amenities": amenities, "search": search, "lat": lat, "lon": lon,
+        "radius_km": radius_km, "bbox": bbox, "sort": sort, "highlight": highlight,
+        "cursor": cursor, "offset": offset, "limit": limit,
+    }
+    validators = row_validators(items, "list", normalize_params(params, ("location", "search")), total)
+    if is_not_modified(validators["ETag"], if_none_match=if_none_match):
+        return not_modified_response(validators)
+    response.headers.update(validators)
+    return {
+        "total": total,
+        "total_is_estimate": estimated_total is not None,
+        "items": items,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor
+    }
 
 @router.get("/reserved", response_model=PropertyListResponse, include_in_schema=True)
 async def get_reserved_properties(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Retrieves all reserved properties with total count.
-    This endpoint is publicly accessible.
+    This endpoint is publicly accessible and served from the listing cache.
     """
-    try:
+    async def build():
         # Get total count of reserved properties
         total = await db.scalar(
             select(func.count(Property.id))
@@ -199,11 +551,10 @@ async def get_reserved_properties(
         )
         items = result.scalars().all()
         
-        return {
-            "total": total or 0,
-            "items": items
-        }
-        
+        return {"total": total or 0, "items": items}, row_validators(items, "reserved", total)
+
+    try:
+        return await cached_json_response("reserved", {}, build, PropertyListResponse, if_none_match=if_none_match)
     except Exception as e:
         logger.error(f"Error fetching reserved properties: {str(e)}")
         raise HTTPException(
@@ -214,49 +565,20 @@ async def get_reserved_properties(
 @router.get("/public/{id}", response_model=PropertyResponse)
 async def get_property_public(
     id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Public, non-auth endpoint to fetch a single approved property by id.
     Returns 404 if the property does not exist or is not APPROVED.
     """
-    prop = await db.get(Property, id)
-    if not prop or prop.status != PropertyStatus.APPROVED:
-        raise HTTPException(status_code=404, detail="Property not found")
-    return prop
+    async def build():
+        prop = await db.get(Property, id)
+        if not prop or prop.status != PropertyStatus.APPROVED:
+            raise HTTPException(status_code=404, detail="Property not found")
+        return prop, row_validators([prop])
 
-@router.get("/public", response_model=List[PropertyPublicResponse])
-async def get_all_properties_public(
-    db: AsyncSession = Depends(get_db),
-    location: Optional[str] = None,
-    min_price: Optional[Decimal] = None,
-    max_price: Optional[Decimal] = None,
-    amenities: Optional[List[str]] = Query(None),
-    search: Optional[str] = None,
-    offset: int = 0,
-    limit: int = 20
-):
-    """
-    Public, non-auth endpoint to list approved properties with full details.
-    Supports basic filters and pagination. Only returns APPROVED listings.
-    """
-    query = select(Property).where(Property.status == PropertyStatus.APPROVED)
-
-    if search and db.bind.dialect.name != "sqlite":
-        query = query.where(text("to_tsvector('english', title || ' ' || description) @@ to_tsquery('english', :search_query)").bindparams(search_query=search))
-    if location:
-        query = query.where(Property.location.ilike(f"%{location}%"))
-    if min_price:
-        query = query.where(Property.price >= min_price)
-    if max_price:
-        query = query.where(Property.price <= max_price)
-    if amenities:
-        # Ensure amenities are treated as an array in the query
-        query = query.where(Property.amenities.op('&&')(amenities))
-
-    query = query.offset(offset).limit(limit)
-    result = await db.execute(query)
-    return result.scalars().all()
+    return await cached_json_response("public_detail", {"id": id}, build, PropertyResponse, if_none_match=if_none_match)
 
 @router.put("/{property_id}", response_model=PropertyResponse)
 async def update_property(
@@ -283,10 +605,63 @@ async def update_property(
         setattr(prop, key, value)
         
     await db.commit()
+    await invalidate_listing_cache()
     await db.refresh(prop)
     
     return prop
 
+@router.post("/{property_id}/photos", response_model=PropertyResponse)
+async def add_property_photos(
+    property_id: UUID,
+    files: List[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_db),
+    current_owner_data: dict = Depends(get_current_owner)
+):
+    """
+    Uploads additional photos for a property owned by the currently authenticated user.
+    Either every photo is added or none is.
+    """
+    current_user_id = UUID(current_owner_data["user"]["user_id"])
+
+    prop = await db.get(Property, property_id)
+
+    if not prop or prop.status == PropertyStatus.DELETED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Property not found")
+
+    if prop.user_id != current_user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to update this property")
+
+    photos = _collect_photos(None, files, existing=len(prop.photos or []))
+    stored_photos = await _upload_photos(photos)
+
+    try:
+        # Another request may have added photos during the upload, so lock the row and
+        # re-check the limit in the transaction that appends to the lists
+        prop = await db.scalar(
+            select(Property)
+            .where(Property.id == property_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        _collect_photos(None, files, existing=len(prop.photos or []))
+
+        # Assign new lists so SQLAlchemy detects the change to the JSON columns. Photos
+        # uploaded before variants existed get an empty entry to keep the lists aligned.
+        existing_photos = list(prop.photos or [])
+        existing_variants = list(prop.photo_variants or [])
+        existing_variants += [{}] * (len(existing_photos) - len(existing_variants))
+        prop.photos = existing_photos + [photo.url for photo in stored_photos]
+        prop.photo_variants = existing_variants + [photo.variants for photo in stored_photos]
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        await delete_files_quietly(_photo_urls(stored_photos))
+        raise
+    await invalidate_listing_cache()
+    await db.refresh(prop)
+
+    return prop
+
 @router.delete("/{property_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_property(
     property_id: UUID,
@@ -314,6 +689,7 @@ async def delete_property(
     )
     await db.execute(sql_query, {"id": property_id})
     await db.commit()
+    await invalidate_listing_cache()
     
     return
 
@@ -341,6 +717,7 @@ async def reserve_property(
         
     prop.status = PropertyStatus.RESERVED
     await db.commit()
+    await invalidate_listing_cache()
     await db.refresh(prop)
     
     return prop
@@ -369,148 +746,94 @@ async def unreserve_property(
         
     prop.status = PropertyStatus.APPROVED
     await db.commit()
+    await invalidate_listing_cache()
     await db.refresh(prop)
     
     return prop
 
-@router.patch("/{property_id}/approve-and-pay", response_model=PaymentInitiationResponse)
+@router.patch(
+    "/{property_id}/approve-and-pay",
+    response_model=PaymentInitiationResponse,
+    responses={status.HTTP_202_ACCEPTED: {"model": PaymentJobResponse}}
+)
 async def approve_and_pay(
     property_id: UUID,
+    response: Response,
+    respond_async: bool = Query(False, alias="async", description="Queue the initiation and return 202 with a job to poll"),
     db: AsyncSession = Depends(get_db),
     current_owner_data: dict = Depends(get_current_owner)
 ):
     """
     Approves a PENDING property and initiates its payment process.
+
+    The property is claimed and the result recorded in two short transactions;
+    no database connection is held while the payment service is called. Repeating
+    the request returns the payment that was already initiated.
+
+    With `async=true` the initiation is queued and the response is 202 with a job
+    whose status, and eventually checkout_url, is polled at `/payment-jobs/{job_id}`.
     """
     current_user = current_owner_data["user"]
     access_token = current_owner_data["token"]
+    user_id = UUID(current_user['user_id'])
 
-    prop = await db.get(Property, property_id)
-
-    if not prop:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Property not found")
-    
-    if prop.user_id != UUID(current_user['user_id']):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to approve this property")
-
-    if prop.status != PropertyStatus.PENDING:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only pending properties can be approved for payment.")
-    
-    if prop.payment_status != PaymentStatus.PENDING:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Payment process already initiated or completed for this property.")
-
-    max_retries = 3
-    backoff_factor = 1  # seconds
-
-    for attempt in range(max_retries + 1):
-        try:
-            # Initiate payment with the payment service
-            request_id, payment_id, chapa_tx_ref, checkout_url = await initiate_payment(
-                property_id=prop.id,
-                user_id=current_user['user_id'],
-                access_token=access_token
-            )
-            
-            # Store the payment_id and commit
-            prop.payment_id = payment_id
-            # The payment_status will be updated by the webhook after actual payment confirmation
-            await db.commit()
-            await db.refresh(prop)
-            break  # Break out of the retry loop if successful
-
-        except httpx.HTTPStatusError as e:
-            error_detail = f"Payment service returned an error: {e.response.status_code}"
+    claim = await claim_payment_initiation(db, property_id, user_id)
+    if claim is None:
+        initiation = await existing_payment_initiation(db, property_id, user_id)
+    else:
+        if respond_async:
+            job = PaymentJob(claim=claim, user_id=user_id, access_token=access_token)
             try:
-                error_detail = e.response.json().get("detail", error_detail)
-            except Exception:
-                pass
-
-            logger.error(
-                "HTTP status error while initiating payment",
-                property_id=str(prop.id),
-                status_code=e.response.status_code,
-                error_detail=error_detail,
-                attempt=attempt + 1,
-                max_retries=max_retries
-            )
-
-            if e.response.status_code == 429:
-                if attempt < max_retries:
-                    # Get retry-after header if available, otherwise use exponential backoff
-                    retry_after = e.response.headers.get("retry-after")
-                    if retry_after and retry_after.isdigit():
-                        sleep_time = float(retry_after)
-                    else:
-                        sleep_time = backoff_factor * (2 ** attempt)
-                    
-                    logger.warning(
-                        "Payment service rate limit hit, retrying...",
-                        property_id=str(prop.id),
-                        sleep_time=sleep_time,
-                        attempt=attempt + 1,
-                        max_retries=max_retries
-                    )
-                    await asyncio.sleep(sleep_time)
-                    continue  # Continue to next retry attempt
-                else:
-                    # If we've exhausted all retries, return a 429 with appropriate detail
-                    raise HTTPException(
-                        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                        detail=(
-                            "Payment service is currently experiencing high load. "
-                            f"Please try again in {int(backoff_factor * 2 ** attempt)} seconds."
-                        )
-                    )
-            
-            # For other 4xx errors, return the original status code and message
-            if 400 <= e.response.status_code < 500:
-                raise HTTPException(
-                    status_code=e.response.status_code,
-                    detail=error_detail or "Bad request to payment service"
+                await payment_job_queue.enqueue(job)
+            except PaymentJobQueueUnavailable as e:
+                logger.warning("payment_job_not_queued", property_id=str(property_id), error=str(e))
+            else:
+                status_url = f"/api/v1/properties/payment-jobs/{job.job_id}"
+                return JSONResponse(
+                    status_code=status.HTTP_202_ACCEPTED,
+                    content={"job_id": job.job_id, "property_id": str(property_id), "status": JOB_QUEUED},
+                    headers={"Location": status_url},
                 )
-            
-            # For 5xx errors, return a 502 Bad Gateway
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=(
-                    "The payment service is currently unavailable. "
-                    "Please try again later."
-                )
-            )
-        except httpx.RequestError as e:
-            logger.error("Network error while initiating payment", property_id=str(prop.id), error_message=str(e))
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Could not connect to the payment service. Please try again later.",
-            )
-        except (ValueError, TypeError) as e:
-            logger.error("Invalid response format from payment service", property_id=str(prop.id), error_message=str(e))
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Received an invalid or unexpected response from the payment service.",
-            )
+        try:
+            initiation = await initiate_claimed_payment(claim, user_id, access_token)
+        except HTTPException as e:
+            await release_payment_claim(db, claim, e.status_code)
+            raise
         except Exception as e:
-            logger.error("An unexpected error occurred during payment initiation", property_id=str(prop.id), error_message=str(e))
+            await release_payment_claim(db, claim)
+            logger.error("An unexpected error occurred during payment initiation", property_id=str(property_id), error_message=str(e))
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="An internal error occurred. Please try again later.",
             )
-    else:
-        # This else block is executed if the loop completes without a 'break'
-        # meaning all retries failed for a 429 error.
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Failed to initiate payment after multiple retries due to rate limiting. Please try again later."
-        )
+        await record_payment_initiation(db, claim, initiation)
 
     return {
-        "property_id": prop.id,
-        "status": prop.status.value, # Property status remains PENDING until payment is confirmed by webhook
-        "payment_id": payment_id,
-        "chapa_tx_ref": chapa_tx_ref,
-        "checkout_url": checkout_url
+        "property_id": property_id,
+        "status": PropertyStatus.PENDING.value, # Property status remains PENDING until payment is confirmed by webhook
+        "payment_id": initiation.payment_id,
+        "chapa_tx_ref": initiation.chapa_tx_ref,
+        "checkout_url": initiation.checkout_url
     }
 
+@router.get("/payment-jobs/{job_id}", response_model=PaymentJobResponse)
+async def get_payment_job_status(
+    job_id: UUID,
+    current_owner_data: dict = Depends(get_current_owner)
+):
+    """
+    Status of a payment initiation queued with `approve-and-pay?async=true`.
+    Poll until `status` is `succeeded` (checkout_url is set) or `failed`.
+    """
+    try:
+        job = await get_payment_job(str(job_id))
+    except (RedisError, OSError) as e:
+        logger.error("payment_job_lookup_failed", job_id=str(job_id), error=str(e))
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Payment job status is temporarily unavailable")
+    if job is None or job["user_id"] != str(current_owner_data["user"]["user_id"]):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Payment job not found")
+    return job
+
 @router.get("/{property_id}/owner-contact", response_model=PropertyOwnerContactResponse)
 async def get_property_owner_contact(
     property_id: UUID,
@@ -547,20 +870,15 @@ async def get_property_owner_contact(
         )
     
     try:
-        # Fetch owner details from User Management Service
-        owner_data = await get_user_by_id(str(prop.user_id))
-        
-        # Extract contact information
-        return PropertyOwnerContactResponse(
-            property_id=prop.id,
-            owner_id=prop.user_id,
-            owner_name=owner_data.get("full_name", owner_data.get("name", "N/A")),
-            owner_email=owner_data.get("email", "N/A"),
-            owner_phone=owner_data.get("phone_number", owner_data.get("phone")),
-            property_title=prop.title,
-            property_location=prop.location
+        # Fetch owner details from the cache or the User Management Service
+        owner_data = await get_owner_profile(str(prop.user_id))
+    except CircuitOpenError:
+        # The user service is failing; answer immediately instead of waiting on it
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Unable to retrieve owner contact information at this time",
+            headers={"Retry-After": str(settings.USER_SERVICE_BREAKER_RESET_SECONDS)}
         )
-        
     except Exception as e:
         logger.error(
             "Failed to fetch owner contact information",
@@ -572,3 +890,20 @@ async def get_property_owner_contact(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Unable to retrieve owner contact information at this time"
         )
+
+    if owner_data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property owner not found"
+        )
+
+    # Extract contact information
+    return PropertyOwnerContactResponse(
+        property_id=prop.id,
+        owner_id=prop.user_id,
+        owner_name=owner_data.get("full_name", owner_data.get("name", "N/A")),
+        owner_email=owner_data.get("email", "N/A"),
+        owner_phone=owner_data.get("phone_number", owner_data.get("phone")),
+        property_title=prop.title,
+        property_location=prop.location
+    )
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, UUID4
 from decimal import Decimal
-from typing import List, Optional
+from typing import Dict, List, Optional
 from enum import Enum
 from datetime import datetime # Added datetime
 
@@ -19,10 +19,19 @@ class HouseType(str, Enum):
 
 class PaymentStatusEnum(str, Enum): # Renamed to avoid conflict with model enum
     PENDING = "PENDING"
+    INITIATING = "INITIATING"
     SUCCESS = "SUCCESS"
     FAILED = "FAILED"
     PAID = "PAID"
 
+class ListingSort(str, Enum):
+    """Stable sort orders supported by the listing endpoints."""
+    NEWEST = "newest"
+    PRICE_ASC = "price_asc"
+    PRICE_DESC = "price_desc"
+    DISTANCE = "distance" # Requires lat/lon
+    RELEVANCE = "relevance" # Requires search
+
 class PropertySubmit(BaseModel):
     title: str
     description: str
@@ -40,6 +49,7 @@ class PropertyResponse(BaseModel):
     house_type: HouseType
     amenities: List[str]
     photos: List[str]
+    photo_variants: List[Dict[str, str]] = [] # Per photo, {width: url} of its resized copies
     status: str
     payment_status: Optional[PaymentStatusEnum] = None # Added payment_status
     approval_timestamp: Optional[datetime] # Added approval_timestamp
@@ -63,6 +73,16 @@ class PaymentInitiationResponse(BaseModel):
     chapa_tx_ref: str
     checkout_url: str
 
+class PaymentJobResponse(BaseModel):
+    """An asynchronous payment initiation; the checkout fields are set once it succeeded."""
+    job_id: str
+    property_id: UUID4
+    status: str # queued, processing, succeeded or failed
+    payment_id: Optional[UUID4] = None
+    chapa_tx_ref: Optional[str] = None
+    checkout_url: Optional[str] = None
+    error: Optional[str] = None
+
 
 class PaymentConfirmation(BaseModel):
     property_id: UUID4
@@ -86,6 +106,9 @@ class PropertyPublicResponse(BaseModel):
     bedrooms: Optional[int] = None
     bathrooms: Optional[int] = None
     area_sqm: Optional[float] = None
+    distance_km: Optional[float] = None # Set when the listing was queried with lat/lon
+    snippet: Optional[str] = None # Highlighted search match, set when highlight=true
+    thumbnail_url: Optional[str] = None # Small rendition of the first photo for list views
 
     class Config:
         from_attributes = True
@@ -106,11 +129,16 @@ class MetricsResponse(BaseModel):
     approved: int
     rejected: int
     total_revenue: Decimal
+    generated_at: datetime # When the numbers were computed
+    snapshot_age_seconds: float = 0.0 # 0 for live numbers, otherwise time since the last snapshot refresh
 
 class PropertyListResponse(BaseModel):
     """Paginated list response with total count for public detailed listings."""
-    total: int
+    total: Optional[int] = None # None when the client opted out of counting
+    total_is_estimate: bool = False
     items: List[PropertyPublicResponse]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 class PropertyOwnerContactResponse(BaseModel):
     """Response model for property owner contact information."""
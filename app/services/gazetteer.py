@@ -0,0 +1,158 @@
+import bisect
+import csv
+import difflib
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import structlog
+
+from app.config import settings
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / "data" / "gazetteer.csv"
+
+# Fuzzy matching is only attempted on parts at least this long, so "aa" or "22"
+# cannot drift onto an unrelated place
+_MIN_FUZZY_LENGTH = 4
+# A prefix shorter than this is too ambiguous to resolve on its own
+_MIN_PREFIX_LENGTH = 3
+
+
+class Gazetteer:
+    """
+    Read-only index of known places, keyed by normalized name (see
+    `app.services.gebeta.normalize_location`). Names and aliases live in one sorted
+    tuple so prefix search is a bisect; coordinates are packed into float arrays.
+
+    Only the first, most specific comma-separated part of a query is resolved by
+    `lookup`, so "Bole, Addis Ababa" gives Bole rather than the city centre.
+    """
+
+    def __init__(self, rows: List[dict]):
+        self._place_names: List[str] = []
+        self._lat = array("d")
+        self._lon = array("d")
+        self._parents: List[str] = []
+        index: Dict[str, int] = {}
+        for row in rows:
+            place = len(self._place_names)
+            self._place_names.append(row["name"])
+            self._lat.append(float(row["lat"]))
+            self._lon.append(float(row["lon"]))
+            self._parents.append(row.get("parent") or "")
+            for name in [row["name"], *(row.get("aliases") or "").split("|")]:
+                name = name.strip()
+                if name:
+                    index.setdefault(name, place)
+        self._keys: Tuple[str, ...] = tuple(sorted(index))
+        self._places = array("H", (index[key] for key in self._keys))
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "Gazetteer":
+        with open(path, newline="", encoding="utf-8") as f:
+            return cls(list(csv.DictReader(f)))
+
+    def __len__(self) -> int:
+        return len(self._place_names)
+
+    def _coords(self, place: int) -> dict:
+        return {"lat": self._lat[place], "lon": self._lon[place]}
+
+    def _exact(self, name: str) -> Optional[int]:
+        i = bisect.bisect_left(self._keys, name)
+        if i < len(self._keys) and self._keys[i] == name:
+            return self._places[i]
+        return None
+
+    def _with_prefix(self, prefix: str) -> List[int]:
+        i = bisect.bisect_left(self._keys, prefix)
+        places = []
+        while i < len(self._keys) and self._keys[i].startswith(prefix):
+            if self._places[i] not in places:
+                places.append(self._places[i])
+            i += 1
+        return places
+
+    def _resolve(self, part: str, context: Tuple[str, ...] = ()) -> Optional[int]:
+        place = self._exact(part)
+        if place is not None:
+            return place
+
+        # "bole around edna mall" -> "bole": the longest known name followed by a space
+        words = part.split(" ")
+        for n in range(len(words) - 1, 0, -1):
+            place = self._exact(" ".join(words[:n]))
+            if place is not None:
+                return place
+
+        # An abbreviation such as "kazan" is accepted only when it is unambiguous
+        if len(part) >= _MIN_PREFIX_LENGTH:
+            places = self._with_prefix(part)
+            if context:
+                # "... , addis ababa" prefers candidates inside Addis Ababa
+                places = [p for p in places if self._parents[p] in context] or places
+            if len(places) == 1:
+                return places[0]
+
+        if len(part) >= _MIN_FUZZY_LENGTH:
+            # Typos rarely change the first letter, and that keeps the candidate list short
+            start = bisect.bisect_left(self._keys, part[0])
+            end = bisect.bisect_left(self._keys, chr(ord(part[0]) + 1))
+            matches = difflib.get_close_matches(part, self._keys[start:end], n=1, cutoff=settings.GAZETTEER_FUZZY_CUTOFF)
+            if matches:
+                return self._places[start + self._keys[start:end].index(matches[0])]
+        return None
+
+    def lookup(self, normalized_query: str) -> Optional[dict]:
+        """
+        Coordinates of the place a normalized location names, or None when its
+        most specific part is not a known place.
+        """
+        parts = tuple(normalized_query.split(", "))
+        if not parts[0]:
+            return None
+        # Later parts naming a known town, e.g. ", addis abeba", by their canonical name
+        context = tuple(
+            self._place_names[area] for area in (self._exact(part) for part in parts[1:]) if area is not None
+        )
+        place = self._resolve(parts[0], context)
+        if place is None:
+            return None
+        if context and self._parents[place] not in context and self._place_names[place] not in context:
+            # "Bole Road, Mekelle" is not Bole in Addis; let Gebeta resolve it
+            return None
+        return self._coords(place)
+
+    def lookup_area(self, normalized_query: str) -> Optional[dict]:
+        """
+        Coordinates of the first part of the query that is a known place, e.g. the
+        city of an unknown street. Coarser than `lookup`; used as a fallback.
+        """
+        for part in normalized_query.split(", "):
+            place = self._exact(part) if part else None
+            if place is not None:
+                return self._coords(place)
+        return None
+
+
+_gazetteer: Optional[Gazetteer] = None
+
+
+def get_gazetteer() -> Optional[Gazetteer]:
+    """The bundled gazetteer, loaded on first use; None when disabled."""
+    global _gazetteer
+    if not settings.GAZETTEER_ENABLED:
+        return None
+    if _gazetteer is None:
+        path = Path(settings.GAZETTEER_PATH) if settings.GAZETTEER_PATH else DEFAULT_PATH
+        try:
+            _gazetteer = Gazetteer.from_csv(path)
+        except (OSError, KeyError, ValueError) as e:
+            # Geocoding still works through Gebeta; don't retry the file on every lookup
+            logger.error("gazetteer_load_failed", path=str(path), error=str(e))
+            _gazetteer = Gazetteer([])
+            return _gazetteer
+        logger.info("gazetteer_loaded", path=str(path), places=len(_gazetteer))
+    return _gazetteer
@@ -1,8 +1,13 @@
 import httpx
 import structlog
 from app.config import settings
+from app.services.gazetteer import get_gazetteer
+from app.services.http_clients import GEBETA, get_http_client
+from app.utils.cache import LocalCache, SingleFlight
 import json
+import unicodedata
 import redis.asyncio as redis
+from redis.exceptions import RedisError
 from urllib.parse import urlparse
 
 logger = structlog.get_logger(__name__)
@@ -17,36 +22,90 @@ redis_client = redis.Redis(
 )
 
 GEBETA_GEOCODE_URL = "https://api.gebeta.app/geocode"
-CACHE_TTL = 3600 # 1 hour
+CACHE_TTL = settings.GEOCODE_CACHE_TTL
+
+# Cached marker for queries Gebeta could not resolve, kept for GEOCODE_NEGATIVE_CACHE_TTL
+_NOT_FOUND = {"_not_found": True}
+
+# Bursts of submits from the same neighbourhood are answered in-process
+_geocode_cache = LocalCache("geocode", settings.GEOCODE_CACHE_LOCAL_MAX_ENTRIES, settings.GEOCODE_CACHE_LOCAL_TTL)
+_geocode_lookups = SingleFlight()
+
+def normalize_location(location_query: str) -> str:
+    """
+    Canonical form of a location for cache keys: case-folded, diacritics removed,
+    whitespace collapsed and spacing around commas made uniform, so "Bole,  Addis Abäba"
+    and "bole, addis ababa" share an entry.
+    """
+    decomposed = unicodedata.normalize("NFKD", location_query)
+    text = "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+    parts = (" ".join(part.split()) for part in text.split(","))
+    return ", ".join(part for part in parts if part)
+
+def _cache_result(cache_key: str, result: dict, ttl: int):
+    _geocode_cache.set(cache_key, result, min(ttl, settings.GEOCODE_CACHE_LOCAL_TTL))
 
 async def get_geocoded_location(location_query: str):
-    cache_key = f"geocode:{location_query}"
-    
+    normalized = normalize_location(location_query)
+    gazetteer = get_gazetteer()
+    if gazetteer is not None:
+        known = gazetteer.lookup(normalized)
+        if known is not None:
+            logger.info("geocoding_gazetteer_hit", location=location_query)
+            return known
+
+    cache_key = f"geocode:{normalized}"
+
+    cached = _geocode_cache.get(cache_key)
+    if cached is not None:
+        return None if cached == _NOT_FOUND else cached
+
+    # Identical lookups in flight share one Redis read and Gebeta call
+    return await _geocode_lookups.do(cache_key, lambda: _lookup(location_query, cache_key))
+
+async def _lookup(location_query: str, cache_key: str):
     # Try to get from cache
-    cached_result = await redis_client.get(cache_key)
+    try:
+        cached_result = await redis_client.get(cache_key)
+    except (RedisError, OSError) as e:
+        logger.warning("geocoding_cache_unavailable", error=str(e))
+        cached_result = None
     if cached_result:
         logger.info("geocoding_cache_hit", location=location_query)
-        return json.loads(cached_result)
+        result = json.loads(cached_result)
+        if result == _NOT_FOUND:
+            _cache_result(cache_key, result, settings.GEOCODE_NEGATIVE_CACHE_TTL)
+            return None
+        _cache_result(cache_key, result, CACHE_TTL)
+        return result
+
+    geocoded_data = await _call_gebeta(location_query)
+    result, ttl = (geocoded_data, CACHE_TTL) if geocoded_data else (_NOT_FOUND, settings.GEOCODE_NEGATIVE_CACHE_TTL)
+    _cache_result(cache_key, result, ttl)
+    try:
+        await redis_client.setex(cache_key, ttl, json.dumps(result))
+    except (RedisError, OSError) as e:
+        logger.warning("geocoding_cache_store_failed", error=str(e))
+    return geocoded_data
 
+async def _call_gebeta(location_query: str):
     # If not in cache, call Gebeta Maps API
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                GEBETA_GEOCODE_URL,
-                params={"query": location_query},
-                timeout=5 # 5-second timeout
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if data and "lat" in data and "lon" in data:
-                geocoded_data = {"lat": data["lat"], "lon": data["lon"]}
-                await redis_client.setex(cache_key, CACHE_TTL, json.dumps(geocoded_data))
-                logger.info("geocoding_success", location=location_query, lat=data["lat"], lon=data["lon"])
-                return geocoded_data
-            else:
-                logger.warning("geocoding_no_results", location=location_query, response=data)
-                return None
+        client = get_http_client(GEBETA)
+        response = await client.get(
+            GEBETA_GEOCODE_URL,
+            params={"query": location_query}
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        if data and "lat" in data and "lon" in data:
+            geocoded_data = {"lat": data["lat"], "lon": data["lon"]}
+            logger.info("geocoding_success", location=location_query, lat=data["lat"], lon=data["lon"])
+            return geocoded_data
+        else:
+            logger.warning("geocoding_no_results", location=location_query, response=data)
+            return None
     except httpx.HTTPStatusError as e:
         logger.error("geocoding_http_error", location=location_query, status_code=e.response.status_code, detail=e.response.text)
         return None
@@ -61,7 +120,14 @@ async def geocode_location_with_fallback(location_query: str):
     geocoded_data = await get_geocoded_location(location_query)
     if geocoded_data:
         return geocoded_data
-    
+
+    # Rather than placing e.g. "Some Street, Hawassa" in Addis, use the known town or area it names
+    gazetteer = get_gazetteer()
+    area = gazetteer.lookup_area(normalize_location(location_query)) if gazetteer is not None else None
+    if area is not None:
+        logger.warning("geocoding_area_fallback", location=location_query, lat=area["lat"], lon=area["lon"])
+        return area
+
     # Fallback to Addis Ababa center
     fallback_lat = 9.03
     fallback_lon = 38.75
@@ -0,0 +1,92 @@
+from typing import Dict, List, Optional
+
+import httpx
+import structlog
+
+from app.config import settings
+
+logger = structlog.get_logger(__name__)
+
+# Upstream names. Each gets its own connection pool so a slow service cannot
+# starve the connections of the others.
+USER_MANAGEMENT = "user_management"
+PAYMENT = "payment"
+NOTIFICATION = "notification"
+GEBETA = "gebeta"
+
+
+def _timeouts() -> Dict[str, float]:
+    return {
+        USER_MANAGEMENT: settings.HTTP_TIMEOUT,
+        PAYMENT: settings.PAYMENT_HTTP_TIMEOUT,
+        NOTIFICATION: settings.HTTP_TIMEOUT,
+        GEBETA: settings.GEOCODE_HTTP_TIMEOUT,
+    }
+
+
+class HttpClients:
+    """
+    Long-lived, connection-pooled httpx clients, one per upstream service. Reusing
+    them keeps TCP/TLS connections alive across requests instead of paying a
+    handshake per call.
+
+    Started and closed by the app's startup/shutdown hooks. Tests can pass a
+    transport (e.g. httpx.MockTransport) to `start`, or `override` a single client.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._retired: List[httpx.AsyncClient] = [] # replaced by `start`, closed in `aclose`
+        self._transport: Optional[httpx.AsyncBaseTransport] = None
+
+    def _create(self, name: str) -> httpx.AsyncClient:
+        timeout = _timeouts()[name]
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=min(settings.HTTP_CONNECT_TIMEOUT, timeout)),
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            http2=settings.HTTP2_ENABLED,
+            transport=self._transport,
+        )
+
+    def start(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Creates the clients. Clients already built with a different transport are
+        replaced, so a transport passed here applies even after the app has started.
+        """
+        if transport is not self._transport:
+            self._retired.extend(self._clients.values())
+            self._clients = {}
+        self._transport = transport
+        for name in _timeouts():
+            if name not in self._clients:
+                self._clients[name] = self._create(name)
+        logger.info("http_clients_started", upstreams=list(self._clients), http2=settings.HTTP2_ENABLED)
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        # Created on first use as well, for code running outside the app (scripts, jobs)
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._clients[name] = self._create(name)
+        return client
+
+    def override(self, name: str, client: httpx.AsyncClient):
+        self._clients[name] = client
+
+    async def aclose(self):
+        clients, self._clients = list(self._clients.values()) + self._retired, {}
+        self._retired = []
+        for client in clients:
+            await client.aclose()
+        self._transport = None
+
+
+http_clients = HttpClients()
+
+
+def get_http_client(name: str) -> httpx.AsyncClient:
+    """Returns the shared client for the upstream `name`."""
+    return http_clients.get(name)
@@ -0,0 +1,145 @@
+import hashlib
+import json
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+from uuid import UUID
+
+import redis.asyncio as redis
+import structlog
+from fastapi import Response
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.utils.conditional import etag_matches, make_etag, not_modified_response
+
+logger = structlog.get_logger(__name__)
+
+# Parse REDIS_URL
+redis_url = urlparse(settings.REDIS_URL)
+redis_client = redis.Redis(
+    host=redis_url.hostname,
+    port=redis_url.port,
+    db=0, # Default DB
+    password=redis_url.password
+)
+
+# Every cache key embeds the current generation. Writers bump it after committing,
+# so entries built from pre-write data become unreachable and simply expire.
+GENERATION_KEY = "listing_cache:generation"
+
+
+def normalize_params(params: Dict[str, Any], case_insensitive: Iterable[str] = ()) -> str:
+    """
+    Returns a canonical JSON form of query parameters so equivalent requests
+    (reordered amenities, "100" vs "100.00", extra whitespace) share a cache entry.
+    """
+    case_insensitive = set(case_insensitive)
+    normalized = {}
+    for key, value in params.items():
+        if value is None or value == "" or value == []:
+            continue
+        if isinstance(value, (list, tuple)):
+            value = sorted(str(v) for v in value)
+        elif isinstance(value, Enum):
+            value = value.value
+        elif isinstance(value, Decimal):
+            value = format(value.normalize(), "f")
+        elif isinstance(value, UUID):
+            value = str(value)
+        elif isinstance(value, str):
+            value = value.strip()
+            if key in case_insensitive:
+                value = value.casefold()
+        normalized[key] = value
+    return json.dumps(normalized, sort_keys=True, default=str)
+
+
+@lru_cache(maxsize=None)
+def _adapter(response_model) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+
+def _not_modified(headers: Dict[str, str], cache_status: str) -> Response:
+    validators = {k: v for k, v in headers.items() if k in ("ETag", "Last-Modified")}
+    return not_modified_response({**validators, "X-Cache": cache_status})
+
+
+def _build_response(entry: dict, cache_status: str, if_none_match: Optional[str] = None) -> Response:
+    headers = dict(entry["headers"])
+    if etag_matches(if_none_match, headers["ETag"]):
+        return _not_modified(headers, cache_status)
+    headers["X-Cache"] = cache_status
+    return Response(content=entry["body"], media_type="application/json", headers=headers)
+
+
+async def cached_json_response(
+    scope: str,
+    params: Dict[str, Any],
+    build: Callable[[], Awaitable[Tuple[Any, Optional[Dict[str, str]]]]],
+    response_model,
+    if_none_match: Optional[str] = None,
+    case_insensitive: Iterable[str] = ()
+) -> Response:
+    """
+    Serves a public read endpoint from Redis, or builds, serializes and stores it.
+
+    Args:
+        scope: Endpoint name, part of the cache key.
+        params: The endpoint's parsed query/path parameters.
+        build: Coroutine returning (data, extra response headers) on a miss. The headers
+            should carry an ETag derived from the data's (id, updated_at) so a matching
+            If-None-Match is answered before serializing; a body hash is used otherwise.
+        response_model: Type used to validate and serialize `data`.
+        if_none_match: The request's If-None-Match header, answered with a 304 on a match.
+        case_insensitive: Parameter names whose case does not affect the result.
+
+    Returns:
+        A JSON response carrying ETag and X-Cache (HIT, MISS or BYPASS) headers.
+        When Redis is unavailable the endpoint is served uncached.
+    """
+    key = None
+    if settings.LISTING_CACHE_ENABLED:
+        try:
+            generation = await redis_client.get(GENERATION_KEY)
+            digest = hashlib.sha256(normalize_params(params, case_insensitive).encode()).hexdigest()
+            key = f"listing_cache:{int(generation or 0)}:{scope}:{digest}"
+            cached = await redis_client.get(key)
+            if cached:
+                return _build_response(json.loads(cached), "HIT", if_none_match)
+        except (RedisError, OSError) as e:
+            logger.warning("listing_cache_unavailable", scope=scope, error=str(e))
+            key = None
+
+    data, headers = await build()
+    headers = dict(headers or {})
+    cache_status = "MISS" if key else "BYPASS"
+    if "ETag" in headers and etag_matches(if_none_match, headers["ETag"]):
+        return _not_modified(headers, cache_status)
+
+    adapter = _adapter(response_model)
+    body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+    headers.setdefault("ETag", make_etag(body.decode()))
+    entry = {"body": body.decode(), "headers": headers}
+
+    if key:
+        try:
+            await redis_client.setex(key, settings.LISTING_CACHE_TTL, json.dumps(entry))
+        except (RedisError, OSError) as e:
+            logger.warning("listing_cache_store_failed", scope=scope, error=str(e))
+    return _build_response(entry, cache_status, if_none_match)
+
+
+async def invalidate_listing_cache():
+    """
+    Invalidates every cached public listing response. Call after committing any
+    change that can alter what anonymous readers see.
+    """
+    try:
+        await redis_client.incr(GENERATION_KEY)
+    except (RedisError, OSError) as e:
+        # Entries still expire after LISTING_CACHE_TTL, which bounds the staleness
+        logger.error("listing_cache_invalidation_failed", error=str(e))
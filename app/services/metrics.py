@@ -0,0 +1,86 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import structlog
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.dependencies.database import AsyncSessionLocal
+from app.models.property import Property, PropertyStatus, PaymentStatus
+
+logger = structlog.get_logger(__name__)
+
+# Created by alembic revision e5f6a7b8c9d0
+METRICS_SNAPSHOT_VIEW = "listing_metrics_snapshot"
+
+
+def _aggregate_query():
+    """All listing metrics in one pass over properties."""
+    return select(
+        func.count().label("total_listings"),
+        func.count().filter(Property.status == PropertyStatus.PENDING).label("pending"),
+        func.count().filter(Property.status == PropertyStatus.APPROVED).label("approved"),
+        func.count().filter(Property.status == PropertyStatus.REJECTED).label("rejected"),
+        func.coalesce(
+            # paymentstatus in the database has no PAID value; comparing with it is an error
+            func.sum(Property.price).filter(Property.payment_status == PaymentStatus.SUCCESS),
+            0
+        ).label("total_revenue"),
+    )
+
+
+def _to_metrics(row, generated_at: datetime, snapshot: bool = False) -> dict:
+    if generated_at.tzinfo is None:
+        generated_at = generated_at.replace(tzinfo=timezone.utc)
+    age = (datetime.now(timezone.utc) - generated_at).total_seconds() if snapshot else 0.0
+    return {
+        "total_listings": row.total_listings or 0,
+        "pending": row.pending or 0,
+        "approved": row.approved or 0,
+        "rejected": row.rejected or 0,
+        "total_revenue": Decimal(row.total_revenue) if row.total_revenue is not None else Decimal("0"),
+        "generated_at": generated_at,
+        "snapshot_age_seconds": max(age, 0.0),
+    }
+
+
+async def get_listing_metrics(db: AsyncSession) -> dict:
+    """
+    Returns listing counts and revenue.
+
+    With METRICS_SNAPSHOT_ENABLED on Postgres the numbers come from the materialized
+    snapshot refreshed by the scheduler, so the cost does not grow with the table;
+    otherwise a single aggregate query runs live. `snapshot_age_seconds` tells callers
+    how fresh the numbers are.
+    """
+    if settings.METRICS_SNAPSHOT_ENABLED and db.bind.dialect.name == "postgresql":
+        try:
+            result = await db.execute(text(
+                f"SELECT total_listings, pending, approved, rejected, total_revenue, refreshed_at FROM {METRICS_SNAPSHOT_VIEW}"
+            ))
+            row = result.one_or_none()
+            if row is not None:
+                return _to_metrics(row, row.refreshed_at, snapshot=True)
+        except DBAPIError as e:
+            logger.warning("metrics_snapshot_unavailable", error=str(e))
+            await db.rollback()
+
+    row = (await db.execute(_aggregate_query())).one()
+    return _to_metrics(row, datetime.now(timezone.utc))
+
+
+async def refresh_metrics_snapshot():
+    """
+    Background task that refreshes the metrics snapshot. CONCURRENTLY keeps the
+    view readable while it is rebuilt.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            await db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {METRICS_SNAPSHOT_VIEW}"))
+            await db.commit()
+            logger.info("metrics_snapshot_refreshed")
+        except DBAPIError as e:
+            await db.rollback()
+            logger.error("metrics_snapshot_refresh_failed", error=str(e))
@@ -1,14 +1,135 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
 import httpx
+import structlog
+
 from app.config import settings
-from app.utils.retry import async_retry
-
-@async_retry()
-async def send_notification(user_id: str, message: str):
-    async with httpx.AsyncClient() as client:
-        # This is a mock implementation. In a real scenario, you would format
-        # the message based on the user's preferred language.
-        payload = {"user_id": user_id, "message": message}
-        await client.post(f"{settings.NOTIFICATION_URL}/send", json=payload)
+from app.services.http_clients import NOTIFICATION, get_http_client
+
+logger = structlog.get_logger(__name__)
+
+# Statuses meaning the notification service has no bulk endpoint
+_BULK_UNSUPPORTED = (404, 405, 501)
+
+
+@dataclass
+class NotificationResult:
+    user_id: str
+    delivered: bool
+    error: Optional[str] = None
+
+
+async def post_notification(user_id: str, message: str):
+    """Single delivery attempt; raises on connection errors and non-2xx responses."""
+    client = get_http_client(NOTIFICATION)
+    # This is a mock implementation. In a real scenario, you would format
+    # the message based on the user's preferred language.
+    payload = {"user_id": user_id, "message": message}
+    response = await client.post(f"{settings.NOTIFICATION_URL}/send", json=payload)
+    response.raise_for_status()
+
+
+class NotificationSender:
+    """
+    Sends notifications in bulk requests of up to NOTIFICATION_BATCH_MAX_SIZE to
+    `{NOTIFICATION_URL}/send/batch`, which answers with one result per message:
+
+        {"results": [{"delivered": true}, {"delivered": false, "error": "..."}]}
+
+    If the bulk endpoint is missing, messages are sent one per request instead,
+    NOTIFICATION_SEND_CONCURRENCY at a time, and the bulk endpoint is probed again
+    after NOTIFICATION_BULK_RETRY_SECONDS, so a routing or deploy blip does not turn
+    bulk delivery off for good.
+    """
+
+    def __init__(self):
+        self._bulk_retry_at = 0.0 # monotonic time before which single sends are used
+
+    @property
+    def bulk_supported(self) -> bool:
+        return settings.NOTIFICATION_BULK_ENABLED and time.monotonic() >= self._bulk_retry_at
+
+    def _mark_bulk_unsupported(self):
+        if self.bulk_supported:
+            logger.warning(
+                "notification_bulk_unsupported",
+                url=f"{settings.NOTIFICATION_URL}/send/batch",
+                retry_in_seconds=settings.NOTIFICATION_BULK_RETRY_SECONDS,
+            )
+        self._bulk_retry_at = time.monotonic() + settings.NOTIFICATION_BULK_RETRY_SECONDS
+
+    async def _post_bulk(self, items: Sequence[Tuple[str, str]]) -> Optional[List[NotificationResult]]:
+        """Results for `items`, or None when the bulk endpoint does not exist."""
+        client = get_http_client(NOTIFICATION)
+        payload = {"notifications": [{"user_id": user_id, "message": message} for user_id, message in items]}
+        try:
+            response = await client.post(f"{settings.NOTIFICATION_URL}/send/batch", json=payload)
+        except httpx.RequestError as e:
+            return [NotificationResult(user_id, False, str(e)) for user_id, _ in items]
+        if response.status_code in _BULK_UNSUPPORTED:
+            return None
+        if response.is_error:
+            error = f"notification service returned {response.status_code}"
+            return [NotificationResult(user_id, False, error) for user_id, _ in items]
+
+        try:
+            results = response.json().get("results") if response.content else None
+        except (ValueError, AttributeError):
+            results = None
+        if not results:
+            # No per-message detail: a 2xx accepts the whole batch
+            return [NotificationResult(user_id, True) for user_id, _ in items]
+        return [
+            NotificationResult(user_id, bool(result.get("delivered")), result.get("error"))
+            for (user_id, _), result in zip(items, results)
+        ] + [NotificationResult(user_id, False, "missing from bulk response") for user_id, _ in items[len(results):]]
+
+    async def _post_single(self, user_id: str, message: str, semaphore: asyncio.Semaphore) -> NotificationResult:
+        async with semaphore:
+            try:
+                await post_notification(user_id, message)
+            except httpx.HTTPStatusError as e:
+                return NotificationResult(user_id, False, f"notification service returned {e.response.status_code}")
+            except Exception as e:
+                return NotificationResult(user_id, False, str(e) or type(e).__name__)
+            return NotificationResult(user_id, True)
+
+    async def send_many(self, items: Sequence[Tuple[str, str]]) -> List[NotificationResult]:
+        """
+        Delivers (user_id, message) pairs and returns a result for each, in order.
+        Never raises for delivery failures; they are reported in the results.
+        """
+        items = list(items)
+        semaphore = asyncio.Semaphore(settings.NOTIFICATION_SEND_CONCURRENCY)
+        size = settings.NOTIFICATION_BATCH_MAX_SIZE
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+
+        async def send_chunk(chunk) -> List[NotificationResult]:
+            if self.bulk_supported:
+                async with semaphore:
+                    results = await self._post_bulk(chunk)
+                if results is not None:
+                    return results
+                self._mark_bulk_unsupported()
+            return list(await asyncio.gather(*(self._post_single(user_id, message, semaphore) for user_id, message in chunk)))
+
+        results = [result for chunk_results in await asyncio.gather(*(send_chunk(c) for c in chunks)) for result in chunk_results]
+        failed = sum(not result.delivered for result in results)
+        if failed:
+            logger.warning("notifications_not_delivered", failed=failed, total=len(results))
+        return results
+
+
+notification_sender = NotificationSender()
+
+
+async def post_notifications(items: Sequence[Tuple[str, str]]) -> List[NotificationResult]:
+    """Delivers (user_id, message) pairs in bulk; see NotificationSender.send_many."""
+    return await notification_sender.send_many(items)
+
 
 def get_approval_message(language: str, title: str, location: str, payment_amount: float, payment_currency: str) -> str:
     messages = {
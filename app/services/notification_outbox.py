@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import structlog
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.dependencies.database import AsyncSessionLocal
+from app.models.notification_outbox import NotificationOutbox, OutboxStatus
+from app.services.notification import post_notifications
+
+logger = structlog.get_logger(__name__)
+
+
+def enqueue_notification(db: AsyncSession, user_id, message: str) -> NotificationOutbox:
+    """
+    Adds a notification to the outbox in the caller's transaction; it is only
+    sent once that transaction commits.
+    """
+    entry = NotificationOutbox(user_id=user_id, message=message)
+    db.add(entry)
+    return entry
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    # 30s, 1m, 2m, ... up to an hour with the default base
+    return timedelta(seconds=min(settings.NOTIFICATION_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), 3600))
+
+
+async def _claim_batch(now: datetime):
+    """
+    Leases a batch of due notifications by pushing their next_attempt_at past the
+    lease and counting the attempt, then commits so no lock is held while sending.
+    A worker that dies mid-batch leaves rows that become due again once the lease ends.
+    """
+    due_ids = (
+        select(NotificationOutbox.id)
+        .where(NotificationOutbox.status == OutboxStatus.PENDING, NotificationOutbox.next_attempt_at <= now)
+        .order_by(NotificationOutbox.next_attempt_at)
+        .limit(settings.NOTIFICATION_OUTBOX_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    stmt = (
+        update(NotificationOutbox)
+        .where(NotificationOutbox.id.in_(due_ids.scalar_subquery()))
+        .values(
+            attempts=NotificationOutbox.attempts + 1,
+            next_attempt_at=now + timedelta(seconds=settings.NOTIFICATION_OUTBOX_LEASE_SECONDS),
+        )
+        .returning(NotificationOutbox.id, NotificationOutbox.user_id, NotificationOutbox.message, NotificationOutbox.attempts)
+        .execution_options(synchronize_session=False)
+    )
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(stmt)).all()
+        await db.commit()
+    return rows
+
+
+async def _deliver(rows) -> List[Optional[str]]:
+    """The delivery error of each row, None for those delivered."""
+    results = await post_notifications([(str(row.user_id), row.message) for row in rows])
+    return [None if result.delivered else (result.error or "not delivered") for result in results]
+
+
+async def _record_results(rows, errors: List[Optional[str]]):
+    now = datetime.now(timezone.utc)
+    changes = []
+    for row, error in zip(rows, errors):
+        if error is None:
+            changes.append({"id": row.id, "status": OutboxStatus.SENT, "sent_at": now, "last_error": None})
+        elif row.attempts >= settings.NOTIFICATION_OUTBOX_MAX_ATTEMPTS:
+            logger.error("notification_outbox_gave_up", outbox_id=str(row.id), attempts=row.attempts, error=error)
+            changes.append({"id": row.id, "status": OutboxStatus.FAILED, "last_error": error})
+        else:
+            logger.warning("notification_outbox_retry", outbox_id=str(row.id), attempts=row.attempts, error=error)
+            changes.append({"id": row.id, "next_attempt_at": now + _retry_delay(row.attempts), "last_error": error})
+
+    async with AsyncSessionLocal() as db:
+        # ORM bulk UPDATE by primary key: one executemany per distinct set of columns
+        await db.execute(update(NotificationOutbox), changes)
+        await db.commit()
+
+
+async def dispatch_notification_outbox():
+    """
+    Background task that sends due outbox notifications, NOTIFICATION_OUTBOX_BATCH_SIZE
+    at a time through the bulk notification API. Failed sends are retried with
+    exponential backoff up to NOTIFICATION_OUTBOX_MAX_ATTEMPTS.
+    """
+    sent = failed = 0
+    while True:
+        rows = await _claim_batch(datetime.now(timezone.utc))
+        if not rows:
+            break
+        errors = await _deliver(rows)
+        await _record_results(rows, errors)
+        failed_now = sum(error is not None for error in errors)
+        sent += len(rows) - failed_now
+        failed += failed_now
+        if len(rows) < settings.NOTIFICATION_OUTBOX_BATCH_SIZE:
+            break
+    if sent or failed:
+        logger.info("notification_outbox_dispatched", sent=sent, failed=failed)
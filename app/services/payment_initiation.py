@@ -0,0 +1,186 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID, uuid4
+
+import structlog
+from fastapi import HTTPException, status
+from sqlalchemy import and_, case, func, literal, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.property import Property, PropertyStatus, PaymentStatus
+from app.services.payment_service import PaymentRateLimitedError, initiate_payment
+from app.utils.rate_limiter import AsyncRateLimiter
+
+logger = structlog.get_logger(__name__)
+
+# Payment service answers that leave no doubt the payment was not created; after
+# these the idempotency key is dropped so the next attempt starts afresh
+_DEFINITE_REJECTIONS = {400, 401, 403, 404, 422}
+
+
+@dataclass
+class PaymentClaim:
+    property_id: UUID
+    request_id: UUID # idempotency key for the payment service
+
+
+@dataclass
+class PaymentInitiation:
+    payment_id: Optional[UUID]
+    chapa_tx_ref: Optional[str]
+    checkout_url: Optional[str]
+
+
+async def claim_payment_initiation(db: AsyncSession, property_id: UUID, user_id: UUID) -> Optional[PaymentClaim]:
+    """
+    Moves the owner's PENDING, not yet initiated property to INITIATING in one
+    conditional UPDATE and commits, so no connection is held during the payment
+    call and a concurrent request cannot claim it too. A claim older than
+    PAYMENT_INITIATION_LEASE_SECONDS is treated as abandoned and can be taken over.
+    The stored idempotency key is reused, so retries never create a second payment.
+
+    Returns None when there is nothing to claim; see `existing_payment_initiation`.
+    """
+    now = datetime.now(timezone.utc)
+    lease_expired = now - timedelta(seconds=settings.PAYMENT_INITIATION_LEASE_SECONDS)
+    stmt = (
+        update(Property)
+        .where(
+            Property.id == property_id,
+            Property.user_id == user_id,
+            Property.status == PropertyStatus.PENDING,
+            Property.payment_id.is_(None),
+            or_(
+                Property.payment_status == PaymentStatus.PENDING,
+                and_(Property.payment_status == PaymentStatus.INITIATING, Property.payment_initiated_at < lease_expired),
+            ),
+        )
+        .values(
+            payment_status=PaymentStatus.INITIATING,
+            payment_initiated_at=now,
+            payment_request_id=func.coalesce(Property.payment_request_id, uuid4()),
+        )
+        .returning(Property.payment_request_id)
+        .execution_options(synchronize_session=False)
+    )
+    request_id = (await db.execute(stmt)).scalar_one_or_none()
+    await db.commit()
+    if request_id is None:
+        return None
+    return PaymentClaim(property_id=property_id, request_id=request_id)
+
+
+async def existing_payment_initiation(db: AsyncSession, property_id: UUID, user_id: UUID) -> PaymentInitiation:
+    """
+    Explains why a property could not be claimed. A payment that was already
+    initiated is returned again, so repeated clicks get the same checkout.
+
+    Raises:
+        HTTPException: 404, 403, 400 when the property cannot be paid for, or 409
+            while another request is initiating its payment.
+    """
+    prop = await db.get(Property, property_id, populate_existing=True)
+    if not prop:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Property not found")
+    if prop.user_id != user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to approve this property")
+    if prop.status != PropertyStatus.PENDING:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only pending properties can be approved for payment.")
+    if prop.payment_status == PaymentStatus.INITIATING:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Payment initiation is already in progress for this property.")
+    if prop.payment_status == PaymentStatus.PENDING and prop.payment_id and prop.payment_checkout_url:
+        return PaymentInitiation(prop.payment_id, prop.payment_tx_ref, prop.payment_checkout_url)
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Payment process already initiated or completed for this property.")
+
+
+async def record_payment_initiation(db: AsyncSession, claim: PaymentClaim, initiation: PaymentInitiation):
+    """
+    Stores the payment service's answer and ends the claim. The payment itself
+    stays PENDING until the confirmation webhook arrives; a webhook that beat us
+    here keeps its status.
+    """
+    await db.execute(
+        update(Property)
+        .where(Property.id == claim.property_id, Property.payment_request_id == claim.request_id)
+        .values(
+            payment_id=initiation.payment_id,
+            payment_tx_ref=initiation.chapa_tx_ref,
+            payment_checkout_url=initiation.checkout_url,
+            payment_status=case(
+                (Property.payment_status == PaymentStatus.INITIATING, literal(PaymentStatus.PENDING, Property.payment_status.type)),
+                else_=Property.payment_status,
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def release_payment_claim(db: AsyncSession, claim: PaymentClaim, status_code: Optional[int] = None):
+    """
+    Returns a claimed property to PENDING after a failed initiation. The
+    idempotency key is kept unless the payment service definitely rejected the
+    request: after a timeout or 5xx the payment may exist, and retrying with the
+    same key lets the payment service return it instead of charging twice.
+    """
+    values = {"payment_status": PaymentStatus.PENDING}
+    if status_code in _DEFINITE_REJECTIONS:
+        values["payment_request_id"] = None
+    await db.execute(
+        update(Property)
+        .where(
+            Property.id == claim.property_id,
+            Property.payment_request_id == claim.request_id,
+            Property.payment_status == PaymentStatus.INITIATING,
+        )
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def initiate_claimed_payment(
+    claim: PaymentClaim,
+    user_id: UUID,
+    access_token: str,
+    rate_limiter: Optional[AsyncRateLimiter] = None
+) -> PaymentInitiation:
+    """
+    Calls the payment service for a claim, retrying rate limited attempts up to
+    PAYMENT_INITIATION_MAX_RETRIES times after its Retry-After or an exponential
+    backoff. Every attempt carries the claim's idempotency key. With a
+    `rate_limiter`, each attempt waits for it and a 429 pauses it for everyone.
+
+    Raises:
+        HTTPException: With the payment service's error once retries are exhausted.
+    """
+    max_retries = settings.PAYMENT_INITIATION_MAX_RETRIES
+    for attempt in range(max_retries + 1):
+        if rate_limiter is not None:
+            await rate_limiter.acquire()
+        try:
+            _, payment_id, chapa_tx_ref, checkout_url = await initiate_payment(
+                property_id=claim.property_id,
+                user_id=user_id,
+                access_token=access_token,
+                request_id=claim.request_id,
+            )
+            return PaymentInitiation(payment_id, chapa_tx_ref, checkout_url)
+        except PaymentRateLimitedError as e:
+            if attempt == max_retries:
+                raise
+            sleep_time = e.retry_after if e.retry_after is not None else settings.PAYMENT_RETRY_BACKOFF_SECONDS * (2 ** attempt)
+            logger.warning(
+                "Payment service rate limit hit, retrying...",
+                property_id=str(claim.property_id),
+                sleep_time=sleep_time,
+                attempt=attempt + 1,
+                max_retries=max_retries
+            )
+            if rate_limiter is not None:
+                rate_limiter.pause(sleep_time)
+            else:
+                await asyncio.sleep(sleep_time)
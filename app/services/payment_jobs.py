@@ -0,0 +1,175 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+from urllib.parse import urlparse
+from uuid import UUID
+
+import redis.asyncio as redis
+import structlog
+from fastapi import HTTPException
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.dependencies.database import AsyncSessionLocal
+from app.services.payment_initiation import (
+    PaymentClaim, initiate_claimed_payment, record_payment_initiation, release_payment_claim
+)
+from app.utils.rate_limiter import AsyncRateLimiter
+
+logger = structlog.get_logger(__name__)
+
+# Parse REDIS_URL
+redis_url = urlparse(settings.REDIS_URL)
+redis_client = redis.Redis(
+    host=redis_url.hostname,
+    port=redis_url.port,
+    db=0, # Default DB
+    password=redis_url.password
+)
+
+JOB_QUEUED = "queued"
+JOB_PROCESSING = "processing"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+# Every worker's calls to the payment service share this budget
+payment_rate_limiter = AsyncRateLimiter(settings.PAYMENT_RATE_LIMIT_PER_SECOND, settings.PAYMENT_RATE_LIMIT_BURST)
+
+
+class PaymentJobQueueUnavailable(Exception):
+    """Raised when a job cannot be queued; the caller should initiate synchronously."""
+
+
+@dataclass
+class PaymentJob:
+    claim: PaymentClaim
+    user_id: UUID
+    access_token: str
+
+    @property
+    def job_id(self) -> str:
+        # The claim's idempotency key: unique per payment attempt and safe to expose
+        return str(self.claim.request_id)
+
+
+def _job_key(job_id: str) -> str:
+    return f"payment_job:{job_id}"
+
+
+async def _save_job(job: PaymentJob, job_status: str, **fields):
+    record = {
+        "job_id": job.job_id,
+        "property_id": str(job.claim.property_id),
+        "user_id": str(job.user_id),
+        "status": job_status,
+        "updated_at": time.time(),
+        **fields,
+    }
+    await redis_client.setex(_job_key(job.job_id), settings.PAYMENT_JOB_TTL_SECONDS, json.dumps(record))
+
+
+async def _update_job(job: PaymentJob, job_status: str, **fields):
+    # The property row is the source of truth; a missed status update only affects polling
+    try:
+        await _save_job(job, job_status, **fields)
+    except (RedisError, OSError) as e:
+        logger.warning("payment_job_status_not_saved", job_id=job.job_id, status=job_status, error=str(e))
+
+
+async def get_payment_job(job_id: str) -> Optional[dict]:
+    """
+    The job record, or None if unknown or expired. A job left queued or processing
+    by a worker that died is reported failed once its claim lease has run out.
+    """
+    cached = await redis_client.get(_job_key(job_id))
+    if not cached:
+        return None
+    record = json.loads(cached)
+    stale = time.time() - record["updated_at"] > settings.PAYMENT_INITIATION_LEASE_SECONDS
+    if record["status"] in (JOB_QUEUED, JOB_PROCESSING) and stale:
+        record.update(status=JOB_FAILED, error="Payment initiation was interrupted. Please try again.")
+    return record
+
+
+class PaymentJobQueue:
+    """
+    In-process queue of payment initiations, drained by PAYMENT_JOB_WORKERS tasks
+    that share `payment_rate_limiter`, so a burst of approvals reaches the payment
+    service at a steady rate. Job status lives in Redis so any worker can answer polls.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=settings.PAYMENT_JOB_QUEUE_SIZE)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(settings.PAYMENT_JOB_WORKERS)]
+        logger.info("payment_job_workers_started", workers=len(self._workers))
+
+    async def enqueue(self, job: PaymentJob):
+        """
+        Raises:
+            PaymentJobQueueUnavailable: If the queue is not running or full, or the
+                job's status cannot be stored.
+        """
+        if self._queue is None or self._queue.full():
+            raise PaymentJobQueueUnavailable("payment job queue is not accepting jobs")
+        try:
+            await _save_job(job, JOB_QUEUED)
+        except (RedisError, OSError) as e:
+            raise PaymentJobQueueUnavailable(str(e)) from e
+        self._queue.put_nowait(job)
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._process(job)
+            except Exception as e:
+                logger.error("payment_job_failed_unexpectedly", job_id=job.job_id, error=str(e), exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job: PaymentJob):
+        await _update_job(job, JOB_PROCESSING)
+        async with AsyncSessionLocal() as db:
+            try:
+                initiation = await initiate_claimed_payment(job.claim, job.user_id, job.access_token, payment_rate_limiter)
+            except HTTPException as e:
+                await release_payment_claim(db, job.claim, e.status_code)
+                await _update_job(job, JOB_FAILED, error=e.detail, status_code=e.status_code)
+                return
+            except Exception:
+                await release_payment_claim(db, job.claim)
+                await _update_job(job, JOB_FAILED, error="An internal error occurred. Please try again later.", status_code=500)
+                raise
+            await record_payment_initiation(db, job.claim, initiation)
+        await _update_job(
+            job,
+            JOB_SUCCEEDED,
+            payment_id=str(initiation.payment_id) if initiation.payment_id else None,
+            chapa_tx_ref=initiation.chapa_tx_ref,
+            checkout_url=initiation.checkout_url,
+        )
+        logger.info("payment_job_succeeded", job_id=job.job_id, property_id=str(job.claim.property_id))
+
+    async def stop(self):
+        """Stops the workers and releases the claims of jobs that never ran, so owners can retry."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._queue is None:
+            return
+        async with AsyncSessionLocal() as db:
+            while not self._queue.empty():
+                job = self._queue.get_nowait()
+                await release_payment_claim(db, job.claim)
+                await _update_job(job, JOB_FAILED, error="Payment initiation was interrupted. Please try again.", status_code=503)
+        self._queue = None
+
+
+payment_job_queue = PaymentJobQueue()
@@ -4,10 +4,28 @@ from uuid import UUID, uuid4
 from typing import Optional
 from fastapi import HTTPException, status
 from app.config import settings
+from app.services.http_clients import PAYMENT, get_http_client
 
 logger = structlog.get_logger(__name__)
 
-async def initiate_payment(property_id: UUID, user_id: UUID, access_token: str) -> tuple[UUID, Optional[UUID], Optional[str], Optional[str]]:
+
+class PaymentRateLimitedError(HTTPException):
+    """429 from the payment service, with its Retry-After in seconds when it sent one."""
+
+    def __init__(self, retry_after: Optional[float] = None):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Payment service is currently experiencing high load. Please try again later."
+        )
+        self.retry_after = retry_after
+
+
+async def initiate_payment(
+    property_id: UUID,
+    user_id: UUID,
+    access_token: str,
+    request_id: Optional[UUID] = None
+) -> tuple[UUID, Optional[UUID], Optional[str], Optional[str]]:
     """
     Sends a request to the Payment Processing Service to initiate a payment.
     The amount and currency are fixed from settings.
@@ -16,6 +34,8 @@ async def initiate_payment(property_id: UUID, user_id: UUID, access_token: str)
         property_id: The ID of the property to pay for
         user_id: The ID of the user making the payment
         access_token: The access token for authentication
+        request_id: Idempotency key; repeating it must not create a second payment.
+            A new one is generated when omitted.
         
     Returns:
         A tuple containing (request_id, payment_id, chapa_tx_ref, checkout_url)
@@ -25,8 +45,7 @@ async def initiate_payment(property_id: UUID, user_id: UUID, access_token: str)
     """
     initiate_url = f"{settings.PAYMENT_SERVICE_URL}/payments/initiate"
     
-    # Generate a unique request_id based on property_id and timestamp for idempotency
-    request_id = uuid4()
+    request_id = request_id or uuid4()
     
     payload = {
         "request_id": str(request_id),
@@ -39,7 +58,8 @@ async def initiate_payment(property_id: UUID, user_id: UUID, access_token: str)
     
     headers = {
         "Authorization": f"Bearer {str(access_token)}",
-        "Content-Type": "application/json"
+        "Content-Type": "application/json",
+        "Idempotency-Key": str(request_id)
     }
 
     logger.info(
@@ -52,39 +72,37 @@ async def initiate_payment(property_id: UUID, user_id: UUID, access_token: str)
     )
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(initiate_url, json=payload, headers=headers)
-            
-            # Handle rate limiting (429)
-            if response.status_code == 429:
-                logger.warning(
-                    "Rate limited by payment service",
-                    property_id=str(property_id),
-                    status_code=429
-                )
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail="Payment service is currently experiencing high load. Please try again later."
-                )
-            
-            # Raise exception for other non-2xx responses
-            response.raise_for_status()
-            
-            # Process successful response
-            response_data = response.json()
-            payment_id = response_data.get("id")
-            chapa_tx_ref = response_data.get("chapa_tx_ref")
-            checkout_url = response_data.get("checkout_url")
-            
-            if payment_id is None:
-                logger.warning(
-                    "Payment initiated but payment_id not returned by payment service",
-                    property_id=str(property_id),
-                    response_data=response_data
-                )
-                
-            return request_id, UUID(payment_id) if payment_id else None, chapa_tx_ref, checkout_url
+        client = get_http_client(PAYMENT)
+        response = await client.post(initiate_url, json=payload, headers=headers)
+        
+        # Handle rate limiting (429)
+        if response.status_code == 429:
+            logger.warning(
+                "Rate limited by payment service",
+                property_id=str(property_id),
+                status_code=429
+            )
+            retry_after = response.headers.get("retry-after")
+            raise PaymentRateLimitedError(float(retry_after) if retry_after and retry_after.isdigit() else None)
+        
+        # Raise exception for other non-2xx responses
+        response.raise_for_status()
+        
+        # Process successful response
+        response_data = response.json()
+        payment_id = response_data.get("id")
+        chapa_tx_ref = response_data.get("chapa_tx_ref")
+        checkout_url = response_data.get("checkout_url")
+        
+        if payment_id is None:
+            logger.warning(
+                "Payment initiated but payment_id not returned by payment service",
+                property_id=str(property_id),
+                response_data=response_data
+            )
             
+        return request_id, UUID(payment_id) if payment_id else None, chapa_tx_ref, checkout_url
+        
     except httpx.HTTPStatusError as e:
         logger.error(
             "HTTP error from payment service",
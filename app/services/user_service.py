@@ -1,10 +1,46 @@
+import asyncio
+import json
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
 import httpx
+import redis.asyncio as redis
+from redis.exceptions import RedisError
 from app.config import settings
 from app.utils.retry import async_retry
+from app.utils.cache import LocalCache, SingleFlight
+from app.utils.circuit_breaker import CircuitBreaker
+from app.services.http_clients import USER_MANAGEMENT, get_http_client
 import structlog
 
 logger = structlog.get_logger(__name__)
 
+# Parse REDIS_URL
+redis_url = urlparse(settings.REDIS_URL)
+redis_client = redis.Redis(
+    host=redis_url.hostname,
+    port=redis_url.port,
+    db=0, # Default DB
+    password=redis_url.password
+)
+
+# Owner profiles, per worker in front of Redis. Unknown users are cached too, as
+# _NOT_FOUND, for the shorter OWNER_NEGATIVE_CACHE_TTL.
+_NOT_FOUND = {"_not_found": True}
+_owner_cache = LocalCache("owner_profiles", settings.OWNER_CACHE_LOCAL_MAX_ENTRIES, settings.OWNER_CACHE_LOCAL_TTL)
+_owner_lookups = SingleFlight()
+
+def _is_upstream_failure(e: BaseException) -> bool:
+    return isinstance(e, httpx.RequestError) or (
+        isinstance(e, httpx.HTTPStatusError) and e.response.status_code >= 500
+    )
+
+user_service_breaker = CircuitBreaker(
+    "user_management",
+    failure_threshold=settings.USER_SERVICE_BREAKER_THRESHOLD,
+    reset_timeout=settings.USER_SERVICE_BREAKER_RESET_SECONDS,
+    is_failure=_is_upstream_failure
+)
+
 @async_retry()
 async def get_user_by_id(user_id: str, access_token: str = None):
     """
@@ -17,31 +53,122 @@ async def get_user_by_id(user_id: str, access_token: str = None):
     Returns:
         dict: User data including contact information
     """
-    async with httpx.AsyncClient() as client:
-        headers = {}
-        if access_token:
-            headers["Authorization"] = f"Bearer {access_token}"
-            
-        try:
-            response = await client.get(
-                f"{settings.USER_MANAGEMENT_URL}/users/{user_id}",
-                headers=headers,
-                timeout=10.0
-            )
+    client = get_http_client(USER_MANAGEMENT)
+    headers = {}
+    if access_token:
+        headers["Authorization"] = f"Bearer {access_token}"
+
+    try:
+        response = await client.get(
+            f"{settings.USER_MANAGEMENT_URL}/users/{user_id}",
+            headers=headers
+        )
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        logger.error(
+            "Failed to fetch user data",
+            user_id=user_id,
+            status_code=e.response.status_code,
+            error=str(e)
+        )
+        raise
+    except Exception as e:
+        logger.error(
+            "Unexpected error fetching user data",
+            user_id=user_id,
+            error=str(e)
+        )
+        raise
+
+def _owner_key(user_id: str) -> str:
+    return f"owner_profile:{user_id}"
+
+async def _fetch_owner_profiles(user_ids: list) -> Dict[str, Optional[dict]]:
+    """
+    One upstream round trip for `user_ids` through the circuit breaker, without
+    retries. Users the service does not know map to None.
+    """
+    client = get_http_client(USER_MANAGEMENT)
+
+    async def fetch_one(user_id: str):
+        response = await client.get(f"{settings.USER_MANAGEMENT_URL}/users/{user_id}")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    async def fetch():
+        if settings.USER_SERVICE_BATCH_ENABLED and len(user_ids) > 1:
+            response = await client.post(f"{settings.USER_MANAGEMENT_URL}/users/batch", json={"ids": user_ids})
             response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(
-                "Failed to fetch user data",
-                user_id=user_id,
-                status_code=e.response.status_code,
-                error=str(e)
-            )
-            raise
-        except Exception as e:
-            logger.error(
-                "Unexpected error fetching user data",
-                user_id=user_id,
-                error=str(e)
-            )
-            raise
+            found = {str(user["id"]): user for user in response.json()}
+            return {user_id: found.get(user_id) for user_id in user_ids}
+        profiles = await asyncio.gather(*(fetch_one(user_id) for user_id in user_ids))
+        return dict(zip(user_ids, profiles))
+
+    return await user_service_breaker.call(fetch)
+
+async def _store_owner_profiles(profiles: Dict[str, Optional[dict]]):
+    for user_id, profile in profiles.items():
+        ttl = settings.OWNER_CACHE_TTL if profile is not None else settings.OWNER_NEGATIVE_CACHE_TTL
+        _owner_cache.set(user_id, profile or _NOT_FOUND, min(ttl, settings.OWNER_CACHE_LOCAL_TTL))
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for user_id, profile in profiles.items():
+                ttl = settings.OWNER_CACHE_TTL if profile is not None else settings.OWNER_NEGATIVE_CACHE_TTL
+                pipe.setex(_owner_key(user_id), ttl, json.dumps(profile or _NOT_FOUND))
+            await pipe.execute()
+    except (RedisError, OSError) as e:
+        logger.warning("owner_cache_store_failed", error=str(e))
+
+async def get_owner_profiles(user_ids: Iterable[str]) -> Dict[str, Optional[dict]]:
+    """
+    Owner profiles for many users, e.g. to enrich a page of listings. Served from the
+    in-process cache, then Redis, and the remaining users are fetched from the User
+    Management Service in one round trip.
+
+    Returns:
+        user_id -> profile, or None for users the User Management Service does not know.
+
+    Raises:
+        CircuitOpenError: If the user service is failing and profiles are not cached.
+        httpx.HTTPError: If the upstream call fails.
+    """
+    user_ids = list(dict.fromkeys(str(u) for u in user_ids))
+    profiles: Dict[str, Optional[dict]] = {}
+    missing = []
+    for user_id in user_ids:
+        cached = _owner_cache.get(user_id)
+        if cached is None:
+            missing.append(user_id)
+        else:
+            profiles[user_id] = None if cached == _NOT_FOUND else cached
+
+    if missing:
+        try:
+            stored = await redis_client.mget([_owner_key(u) for u in missing])
+        except (RedisError, OSError) as e:
+            logger.warning("owner_cache_unavailable", error=str(e))
+            stored = [None] * len(missing)
+        still_missing = []
+        for user_id, raw in zip(missing, stored):
+            if raw is None:
+                still_missing.append(user_id)
+                continue
+            profile = json.loads(raw)
+            _owner_cache.set(user_id, profile, None if profile != _NOT_FOUND else min(
+                settings.OWNER_CACHE_LOCAL_TTL, settings.OWNER_NEGATIVE_CACHE_TTL
+            ))
+            profiles[user_id] = None if profile == _NOT_FOUND else profile
+
+        if still_missing:
+            fetched = await _owner_lookups.do(tuple(still_missing), lambda: _fetch_owner_profiles(still_missing))
+            await _store_owner_profiles(fetched)
+            profiles.update(fetched)
+
+    return {user_id: profiles.get(user_id) for user_id in user_ids}
+
+async def get_owner_profile(user_id: str) -> Optional[dict]:
+    """Cached profile of a single owner, or None if the user does not exist. See get_owner_profiles."""
+    return (await get_owner_profiles([user_id]))[str(user_id)]
@@ -0,0 +1,91 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+# Every LocalCache by name, so their hit ratios can be reported together
+_registry: Dict[str, "LocalCache"] = {}
+
+
+class LocalCache:
+    """
+    Bounded, per-worker LRU cache whose entries expire after their own TTL.
+    Not shared between workers; put it in front of Redis, not instead of it.
+    """
+
+    def __init__(self, name: str, max_entries: int, default_ttl: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        _registry[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+def cache_stats() -> Dict[str, dict]:
+    """Hit/miss counters of every LocalCache in this worker."""
+    return {name: cache.stats() for name, cache in _registry.items()}
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls for the same key into one: the first caller runs
+    the coroutine and everyone waiting on that key gets its result or exception.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._inflight.get(key)
+        if future is not None:
+            # shield: a cancelled waiter must not cancel the shared call
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(fn())
+        self._inflight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                self._inflight.pop(key, None)
+            else:
+                future.add_done_callback(lambda _: self._inflight.pop(key, None))
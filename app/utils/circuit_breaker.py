@@ -0,0 +1,76 @@
+import time
+from typing import Any, Awaitable, Callable
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream that is currently failing."""
+
+
+class CircuitBreaker:
+    """
+    Fails fast while an upstream is unhealthy.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls raise
+    CircuitOpenError without touching the upstream. After `reset_timeout` seconds one
+    trial call is let through: success closes the circuit, failure re-opens it.
+    Only exceptions for which `is_failure` returns True count, so e.g. a 404 need not.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        is_failure: Callable[[Exception], bool] = lambda e: True
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.failures < self.failure_threshold:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        state = self.state
+        if state == self.OPEN or (state == self.HALF_OPEN and self._trial_in_flight):
+            raise CircuitOpenError(f"{self.name} is unavailable")
+
+        trial = state == self.HALF_OPEN
+        self._trial_in_flight = trial
+        try:
+            result = await fn()
+        except Exception as e:
+            if self.is_failure(e):
+                self._record_failure()
+            raise
+        finally:
+            if trial:
+                self._trial_in_flight = False
+        if self.failures:
+            logger.info("circuit_closed", circuit=self.name)
+        self.failures = 0
+        return result
+
+    def _record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            # Also restarts the timeout after a failed trial call
+            self.opened_at = time.monotonic()
+            logger.warning("circuit_opened", circuit=self.name, failures=self.failures)
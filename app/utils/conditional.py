@@ -0,0 +1,75 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Response, status
+
+
+def make_etag(*parts) -> str:
+    """Builds a strong ETag from the values that determine a response body."""
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def http_date(value: datetime) -> str:
+    """Formats a timestamp as an HTTP date. Naive timestamps are taken as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison, so a W/ prefix on the client's tag is ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def is_not_modified(
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    if_none_match: Optional[str] = None,
+    if_modified_since: Optional[str] = None
+) -> bool:
+    """
+    Evaluates conditional request headers. If-Modified-Since is only consulted when
+    If-None-Match is absent.
+    """
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    """A body-less 304 carrying the response's validators."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+def row_validators(rows, *parts) -> Dict[str, str]:
+    """
+    ETag and Last-Modified for a response built from `rows` (objects with `id` and
+    `updated_at`) plus any other inputs, such as a filter hash or total, in `parts`.
+    Computed from already-loaded rows, so a 304 never needs the body serialized.
+    """
+    etag = make_etag(*parts, *(f"{row.id}:{row.updated_at.isoformat()}" for row in rows))
+    last_modified = max((row.updated_at for row in rows), default=None)
+    return validator_headers(etag, last_modified)
@@ -0,0 +1,99 @@
+import math
+from typing import Optional, Tuple
+
+from sqlalchemy import Float, and_, event, func, type_coerce
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1: Optional[float], lon1: Optional[float], lat2: Optional[float], lon2: Optional[float]) -> Optional[float]:
+    """Great-circle distance in kilometres between two points, or None if any coordinate is missing."""
+    if lat1 is None or lon1 is None or lat2 is None or lon2 is None:
+        return None
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _create_sqlite_functions(dbapi_connection, connection_record):
+    dbapi_connection.create_function("haversine_km", 4, haversine_km, deterministic=True)
+
+
+def register_sqlite_functions(engine):
+    """
+    SQLite has no earthdistance extension, so expose haversine_km() as a SQL function
+    on every connection `engine` opens, to keep geo filters and distance sorting working
+    against local and test databases. Accepts a sync or an async engine.
+    """
+    event.listen(getattr(engine, "sync_engine", engine), "connect", _create_sqlite_functions)
+
+
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """
+    Parses a "min_lon,min_lat,max_lon,max_lat" bounding box.
+
+    Raises:
+        ValueError: If the box is malformed or out of range.
+    """
+    parts = [float(p) for p in bbox.split(",")]
+    if len(parts) != 4:
+        raise ValueError("bbox must be min_lon,min_lat,max_lon,max_lat")
+    min_lon, min_lat, max_lon, max_lat = parts
+    if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lon <= max_lon <= 180):
+        raise ValueError("bbox coordinates are out of range or inverted")
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def distance_km(dialect_name: str, lat_col, lon_col, lat: float, lon: float):
+    """SQL expression for the distance in kilometres from (lat, lon) to each row."""
+    if dialect_name == "postgresql":
+        distance = func.earth_distance(func.ll_to_earth(lat, lon), func.ll_to_earth(lat_col, lon_col)) / 1000.0
+    else:
+        distance = func.haversine_km(lat, lon, lat_col, lon_col)
+    # Typed so the value can be validated as a number, e.g. in pagination cursors
+    return type_coerce(distance, Float)
+
+
+def _earth_box_contains(lat_col, lon_col, lat: float, lon: float, radius_km: float):
+    # Matches the idx_properties_lat_lon GiST expression, so Postgres can use the index
+    return func.earth_box(func.ll_to_earth(lat, lon), radius_km * 1000.0).op("@>")(func.ll_to_earth(lat_col, lon_col))
+
+
+def within_radius(dialect_name: str, lat_col, lon_col, lat: float, lon: float, radius_km: float):
+    """
+    Condition selecting rows within `radius_km` of (lat, lon).
+
+    The cheap box test (earth_box on Postgres, a degree box elsewhere) prefilters
+    candidates; the exact distance check then trims the box corners.
+    """
+    exact = distance_km(dialect_name, lat_col, lon_col, lat, lon) <= radius_km
+    if dialect_name == "postgresql":
+        return and_(_earth_box_contains(lat_col, lon_col, lat, lon, radius_km), exact)
+
+    d_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = math.cos(math.radians(lat))
+    d_lon = 180.0 if cos_lat < 1e-6 else min(180.0, d_lat / cos_lat)
+    return and_(
+        lat_col.between(lat - d_lat, lat + d_lat),
+        lon_col.between(lon - d_lon, lon + d_lon),
+        exact,
+    )
+
+
+def within_bbox(dialect_name: str, lat_col, lon_col, min_lon: float, min_lat: float, max_lon: float, max_lat: float):
+    """Condition selecting rows inside a lat/lon bounding box."""
+    exact = and_(lat_col.between(min_lat, max_lat), lon_col.between(min_lon, max_lon))
+    if dialect_name != "postgresql":
+        return exact
+
+    # Circumscribe the box with an earth_box so the GiST index narrows the candidates first.
+    # earth() is slightly larger than EARTH_RADIUS_KM, hence the 1% margin.
+    center_lat, center_lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+    radius_km = 1.01 * max(
+        haversine_km(center_lat, center_lon, corner_lat, corner_lon)
+        for corner_lat in (min_lat, max_lat)
+        for corner_lon in (min_lon, max_lon)
+    )
+    return and_(_earth_box_contains(lat_col, lon_col, center_lat, center_lon, radius_km), exact)
@@ -0,0 +1,88 @@
+import asyncio
+import io
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from app.config import settings
+from app.utils.upload_validation import UploadRejectedError
+
+_CONTENT_TYPES = {"WEBP": "image/webp", "AVIF": "image/avif"}
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+class InvalidImageError(UploadRejectedError):
+    """Raised when an upload cannot be decoded as an image."""
+
+
+@dataclass
+class ProcessedImage:
+    """Re-encoded renditions of one uploaded photo."""
+    extension: str
+    content_type: str
+    full: bytes # Capped at IMAGE_MAX_WIDTH
+    variants: Dict[int, bytes] = field(default_factory=dict) # Keyed by width
+
+
+def _encode(image: Image.Image, width: int, image_format: str, quality: int) -> bytes:
+    if image.width > width:
+        image = image.resize((width, max(1, round(image.height * width / image.width))), Image.Resampling.LANCZOS)
+    out = io.BytesIO()
+    # No exif/icc arguments are passed, so camera metadata (including GPS) is dropped
+    image.save(out, format=image_format, quality=quality)
+    return out.getvalue()
+
+
+def process_image(data: bytes, image_format: str, quality: int, max_width: int, widths: tuple) -> ProcessedImage:
+    """
+    Applies the EXIF orientation, strips metadata and re-encodes the image at
+    `max_width` plus each smaller width in `widths`. Images are never upscaled.
+    CPU bound; runs in the image process pool.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            image = ImageOps.exif_transpose(source)
+            image.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise InvalidImageError("File is not a supported image") from e
+
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+
+    full_width = min(image.width, max_width)
+    return ProcessedImage(
+        extension=image_format.lower(),
+        content_type=_CONTENT_TYPES[image_format],
+        full=_encode(image, full_width, image_format, quality),
+        variants={w: _encode(image, w, image_format, quality) for w in sorted(set(widths)) if w < full_width},
+    )
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.IMAGE_PROCESS_WORKERS)
+    return _executor
+
+
+async def process_image_async(data: bytes) -> ProcessedImage:
+    """Runs `process_image` with the configured settings outside the request worker's GIL."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _get_executor(),
+        process_image,
+        data,
+        settings.IMAGE_FORMAT,
+        settings.IMAGE_QUALITY,
+        settings.IMAGE_MAX_WIDTH,
+        tuple(settings.IMAGE_VARIANT_WIDTHS),
+    )
+
+
+def shutdown_image_processing():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
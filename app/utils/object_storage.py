@@ -1,47 +1,287 @@
 # app/utils/object_storage.py
+import asyncio
+import os
+from abc import ABC, abstractmethod
+import tempfile
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+import structlog
 from fastapi import UploadFile
-from typing import List
 from supabase import create_client, Client
 from app.config import settings
+from app.utils.image_processing import process_image_async
+from app.utils.upload_validation import (
+    UploadRejectedError, check_upload, iter_limited_chunks, reservation_size, upload_budget
+)
+
+logger = structlog.get_logger(__name__)
+
+# Storage clients are synchronous. Their calls run on this bounded pool so uploads
+# never block the event loop and a burst of uploads cannot exhaust the default executor.
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.STORAGE_MAX_WORKERS, thread_name_prefix="object-storage")
+    return _executor
+
+
+async def _run_blocking(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), partial(func, *args))
+
+
+def iter_upload_chunks(file: UploadFile, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+    """
+    Yields the upload in STORAGE_CHUNK_SIZE pieces instead of buffering it whole,
+    aborting once it passes MAX_FILE_MB.
+    """
+    return iter_limited_chunks(file, chunk_size or settings.STORAGE_CHUNK_SIZE)
+
+
+async def _iter_bytes(data: bytes) -> AsyncIterator[bytes]:
+    for start in range(0, len(data), settings.STORAGE_CHUNK_SIZE):
+        yield data[start:start + settings.STORAGE_CHUNK_SIZE]
+
+
+@dataclass
+class StoredPhoto:
+    """A stored photo and its resized variants, keyed by width."""
+    url: str
+    variants: Dict[str, str] = field(default_factory=dict)
+
+    def all_urls(self) -> List[str]:
+        return [self.url, *self.variants.values()]
+
+
+class StorageBackend(ABC):
+    """Interface implemented by the object storage backends."""
+
+    @abstractmethod
+    async def upload(self, object_name: str, chunks: AsyncIterator[bytes], content_type: Optional[str]) -> str:
+        """Stores the streamed object and returns its public URL."""
+
+    @abstractmethod
+    async def delete(self, object_name: str) -> None:
+        """Removes the object; a missing object is not an error."""
+
+
+class SupabaseStorageBackend(StorageBackend):
+    """Supabase Storage. Uploads are spooled to a temporary file so the request body is never held in memory at once."""
+
+    def __init__(self):
+        self.client: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+
+    def _bucket(self):
+        return self.client.storage.from_(settings.BUCKET_NAME)
+
+    def _upload_file(self, object_name: str, path: str, content_type: Optional[str]):
+        with open(path, "rb") as fh:
+            # The upload method raises an exception on failure
+            self._bucket().upload(object_name, fh, {"content-type": content_type or "application/octet-stream"})
+
+    async def upload(self, object_name: str, chunks: AsyncIterator[bytes], content_type: Optional[str]) -> str:
+        tmp = await _run_blocking(partial(tempfile.NamedTemporaryFile, delete=False))
+        try:
+            try:
+                async for chunk in chunks:
+                    await _run_blocking(tmp.write, chunk)
+            finally:
+                await _run_blocking(tmp.close)
+            await _run_blocking(self._upload_file, object_name, tmp.name, content_type)
+        finally:
+            await _run_blocking(os.unlink, tmp.name)
+        return self._bucket().get_public_url(object_name)
+
+    async def delete(self, object_name: str) -> None:
+        await _run_blocking(self._bucket().remove, [object_name])
+
+
+class LocalStorageBackend(StorageBackend):
+    """Writes objects under STORAGE_LOCAL_DIR. For tests and offline benchmarks."""
+
+    def __init__(self, root: str, base_url: str):
+        self.root = Path(root) / settings.BUCKET_NAME
+        self.base_url = base_url.rstrip("/")
+
+    def _path(self, object_name: str) -> Path:
+        path = (self.root / object_name).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f"Object name escapes the storage root: {object_name}")
+        return path
+
+    def _open(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return open(path, "wb")
+
+    async def upload(self, object_name: str, chunks: AsyncIterator[bytes], content_type: Optional[str]) -> str:
+        path = self._path(object_name)
+        fh = await _run_blocking(self._open, path)
+        try:
+            async for chunk in chunks:
+                await _run_blocking(fh.write, chunk)
+        except BaseException:
+            await _run_blocking(fh.close)
+            await _run_blocking(partial(path.unlink, missing_ok=True))
+            raise
+        await _run_blocking(fh.close)
+        return f"{self.base_url}/{settings.BUCKET_NAME}/{object_name}"
+
+    async def delete(self, object_name: str) -> None:
+        await _run_blocking(partial(self._path(object_name).unlink, missing_ok=True))
+
+
+def get_storage_backend() -> StorageBackend:
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorageBackend(settings.STORAGE_LOCAL_DIR, settings.STORAGE_LOCAL_BASE_URL)
+    return SupabaseStorageBackend()
+
+
+storage_backend: StorageBackend = get_storage_backend()
+
+
+def shutdown_object_storage():
+    """Waits for in-flight storage calls and stops the worker threads."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
 
-# Initialize Supabase client
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
 
 async def upload_file_to_object_storage(file: UploadFile) -> str:
     """
-    Uploads a file to Supabase Storage and returns its public URL.
+    Uploads an image to the configured object storage and returns its public URL.
+
+    Raises:
+        UploadRejectedError: If the file is too large or not an accepted image type.
     """
     try:
+        content_type, file_extension = await check_upload(file)
         # Generate a unique filename
-        file_extension = file.filename.split(".")[-1]
         unique_filename = f"{uuid.uuid4()}.{file_extension}"
-        
-        # Read file content
-        contents = await file.read()
-
-        # Upload to Supabase Storage
-        # The upload method typically returns a dictionary with 'path' on success
-        # or raises an exception on failure.
-        response = supabase.storage.from_(settings.BUCKET_NAME).upload(unique_filename, contents, {"content-type": file.content_type})
-        
-        # If no exception was raised, assume success and get the public URL
-        # The response object itself might not be directly useful for checking success
-        # beyond not raising an exception.
-        
-        public_url_response = supabase.storage.from_(settings.BUCKET_NAME).get_public_url(unique_filename)
-        return public_url_response
 
+        async with upload_budget.reserve(reservation_size(file)):
+            return await storage_backend.upload(unique_filename, iter_upload_chunks(file), content_type)
+
+    except UploadRejectedError:
+        raise
     except Exception as e:
-        print(f"Error uploading file to Supabase: {e}")
-        raise e
+        logger.error("photo_upload_failed", filename=file.filename, error=str(e), exc_info=True)
+        raise
 
-async def upload_multiple_files_to_object_storage(files: List[UploadFile]) -> List[str]:
+def _object_path_from_url(public_url: str) -> str:
+    """Recovers the object path from a public URL returned by upload_file_to_object_storage."""
+    marker = f"/{settings.BUCKET_NAME}/"
+    if marker not in public_url:
+        raise ValueError(f"URL is not in bucket {settings.BUCKET_NAME}: {public_url}")
+    return public_url.split(marker, 1)[1].split("?", 1)[0]
+
+async def delete_file_from_object_storage(public_url: str) -> None:
+    """
+    Deletes a previously uploaded file, identified by its public URL.
+    Used to clean up uploads whose property was never saved.
+    """
+    await storage_backend.delete(_object_path_from_url(public_url))
+
+async def delete_files_quietly(urls: List[str]):
+    """Best-effort removal of uploaded files that will not be kept; failures are only logged."""
+    for url in urls:
+        try:
+            await delete_file_from_object_storage(url)
+        except Exception as e:
+            logger.warning("photo_cleanup_failed", url=url, error=str(e))
+
+
+async def upload_photo_to_object_storage(file: UploadFile) -> StoredPhoto:
     """
-    Uploads multiple files to Supabase Storage and returns their public URLs.
+    Uploads a photo with its resized variants. The image is re-encoded without its
+    EXIF metadata in the image process pool; with IMAGE_PROCESSING_ENABLED off the
+    original is stored as uploaded and there are no variants.
+
+    Raises:
+        UploadRejectedError: If the file is too large, not an accepted image type or
+            cannot be decoded.
     """
-    urls = []
-    for file in files:
-        url = await upload_file_to_object_storage(file)
-        urls.append(url)
-    return urls
+    if not settings.IMAGE_PROCESSING_ENABLED:
+        return StoredPhoto(url=await upload_file_to_object_storage(file))
+
+    await check_upload(file)
+    # The whole image has to be in memory to decode it, so it counts against the budget
+    # until it has been re-encoded
+    async with upload_budget.reserve(reservation_size(file)):
+        data = b"".join([chunk async for chunk in iter_upload_chunks(file)])
+        processed = await process_image_async(data)
+        del data
+
+    stem = uuid.uuid4()
+    renditions = {None: processed.full, **processed.variants}
+    names = {
+        width: f"{stem}.{processed.extension}" if width is None else f"{stem}_{width}w.{processed.extension}"
+        for width in renditions
+    }
+    results = await asyncio.gather(
+        *(storage_backend.upload(names[w], _iter_bytes(body), processed.content_type) for w, body in renditions.items()),
+        return_exceptions=True
+    )
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        await delete_files_quietly([r for r in results if isinstance(r, str)])
+        raise errors[0]
+
+    urls = dict(zip(renditions, results))
+    return StoredPhoto(url=urls.pop(None), variants={str(w): url for w, url in urls.items()})
+
+
+class PhotoUploadError(Exception):
+    """
+    Raised when some files of a batch failed to upload. Files that did upload have
+    already been removed again.
+    """
+
+    def __init__(self, failures: List[Dict[str, str]], uploaded_count: int, errors: List[Exception] = ()):
+        self.failures = failures
+        self.uploaded_count = uploaded_count
+        self.errors = list(errors)
+        super().__init__(f"{len(failures)} of {len(failures) + uploaded_count} files failed to upload")
+
+
+async def upload_photos_to_object_storage(files: List[UploadFile]) -> List[StoredPhoto]:
+    """
+    Uploads multiple photos concurrently, at most STORAGE_UPLOAD_CONCURRENCY at a time,
+    and returns them in the order the files were given.
+
+    Raises:
+        PhotoUploadError: If any upload failed. The batch is all-or-nothing, so the
+            files that did upload are deleted before raising.
+    """
+    semaphore = asyncio.Semaphore(settings.STORAGE_UPLOAD_CONCURRENCY)
+
+    async def upload_one(file: UploadFile) -> StoredPhoto:
+        async with semaphore:
+            return await upload_photo_to_object_storage(file)
+
+    results = await asyncio.gather(*(upload_one(f) for f in files), return_exceptions=True)
+    stored = [r for r in results if isinstance(r, StoredPhoto)]
+    uploaded_urls = [url for photo in stored for url in photo.all_urls()]
+    for result in results:
+        # Cancellation and other BaseExceptions are not upload failures
+        if isinstance(result, BaseException) and not isinstance(result, Exception):
+            await delete_files_quietly(uploaded_urls)
+            raise result
+
+    errors = [(file, result) for file, result in zip(files, results) if isinstance(result, Exception)]
+    if errors:
+        await delete_files_quietly(uploaded_urls)
+        raise PhotoUploadError(
+            [{"filename": file.filename, "error": str(error)} for file, error in errors],
+            uploaded_count=len(stored),
+            errors=[error for _, error in errors]
+        )
+    return stored
+
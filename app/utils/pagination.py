@@ -0,0 +1,147 @@
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+CURSOR_NEXT = "next"
+CURSOR_PREV = "prev"
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor is malformed or belongs to another sort order."""
+
+
+def _dump_value(value: Any) -> list:
+    if isinstance(value, datetime):
+        return ["dt", value.isoformat()]
+    if isinstance(value, Decimal):
+        return ["dec", str(value)]
+    if isinstance(value, UUID):
+        return ["uuid", str(value)]
+    return ["raw", value]
+
+
+def _load_value(tagged: list) -> Any:
+    tag, value = tagged
+    if tag == "dt":
+        return datetime.fromisoformat(value)
+    if tag == "dec":
+        return Decimal(value)
+    if tag == "uuid":
+        return UUID(value)
+    if tag == "raw":
+        return value
+    raise InvalidCursorError(f"Unknown cursor value type: {tag}")
+
+
+def _check_key_type(value: Any, expected: type):
+    if expected in (int, float, Decimal):
+        valid = isinstance(value, (int, float, Decimal)) and not isinstance(value, bool)
+    else:
+        valid = isinstance(value, expected)
+    if not valid:
+        raise InvalidCursorError(f"Cursor value has the wrong type for its sort key (expected {expected.__name__})")
+
+
+def encode_cursor(
+    sort: str, values: Sequence[Any], direction: str = CURSOR_NEXT, origin: Optional[Tuple[float, float]] = None
+) -> str:
+    """
+    Encodes the sort key of a boundary row into an opaque, URL-safe cursor.
+    Distance sorts pass the (lat, lon) the distances were measured from as `origin`,
+    since the key values are meaningless for any other point.
+    """
+    payload = {"s": sort, "d": direction, "v": [_dump_value(v) for v in values]}
+    if origin is not None:
+        payload["o"] = list(origin)
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str, sort: str, key_types: Optional[Sequence[type]] = None, origin: Optional[Tuple[float, float]] = None
+) -> Tuple[List[Any], str]:
+    """
+    Decodes a cursor produced by `encode_cursor`. With `key_types`, the Python type
+    of each sort key column, the values are checked against them so a tampered
+    cursor is rejected here instead of failing as a SQL bind.
+
+    Returns:
+        A tuple of (sort key values, direction).
+
+    Raises:
+        InvalidCursorError: If the cursor cannot be decoded, was issued for a different
+            sort or origin, or does not match `key_types`.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = [_load_value(v) for v in payload["v"]]
+        direction = payload["d"]
+        cursor_sort = payload["s"]
+        cursor_origin = payload.get("o")
+    except InvalidCursorError:
+        raise
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorError("Malformed cursor") from e
+
+    if cursor_sort != sort:
+        raise InvalidCursorError("Cursor was issued for a different sort order")
+    if cursor_origin != (list(origin) if origin is not None else None):
+        raise InvalidCursorError("Cursor was issued for a different origin")
+    if direction not in (CURSOR_NEXT, CURSOR_PREV):
+        raise InvalidCursorError(f"Unknown cursor direction: {direction}")
+    if key_types is not None:
+        if len(values) != len(key_types):
+            raise InvalidCursorError("wrong key length")
+        for value, expected in zip(values, key_types):
+            _check_key_type(value, expected)
+    return values, direction
+
+
+def apply_keyset(query, columns: Sequence, descending: bool, values: Optional[Sequence[Any]] = None, direction: str = CURSOR_NEXT):
+    """
+    Orders `query` by `columns` and, when `values` is given, seeks past that row.
+
+    The comparison is a row-value comparison on the full key, so it can be served
+    by a composite index on the same columns instead of scanning skipped rows.
+    Backward pages are fetched in reverse order; the caller must reverse them back.
+    """
+    reverse = descending != (direction == CURSOR_PREV)
+    if values is not None:
+        key = tuple_(*columns)
+        bound = tuple(values)
+        query = query.where(key < bound if reverse else key > bound)
+    return query.order_by(*[c.desc() if reverse else c.asc() for c in columns])
+
+
+class _Explain(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON)` wrapper that keeps the wrapped statement's bind parameters."""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_row_count(db, query) -> Optional[int]:
+    """
+    Returns the planner's row estimate for `query` without executing it.
+    Returns None on databases without a JSON EXPLAIN (e.g. SQLite in tests).
+    """
+    if db.bind.dialect.name != "postgresql":
+        return None
+    plan = await db.scalar(_Explain(query))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+
+class AsyncRateLimiter:
+    """
+    Token bucket shared by every caller in this worker: at most `rate` acquisitions
+    per second on average, with bursts of up to `burst`. `pause` stops everyone,
+    e.g. for the Retry-After of a 429, so one rate limited call slows the whole
+    stream instead of each caller hammering the upstream on its own schedule.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        # The lock makes waiters take tokens in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        # Resume at the steady rate rather than with a burst that would trip the limit again
+        self._tokens = 0.0
+        self._updated = self._paused_until
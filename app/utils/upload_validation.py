@@ -0,0 +1,169 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException, UploadFile, status
+from fastapi.responses import JSONResponse
+
+from app.config import settings
+
+MB = 1024 * 1024
+
+# Content type and file extension for each accepted image format, by leading bytes
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png", "png"),
+)
+_SNIFF_BYTES = 16
+
+
+class UploadRejectedError(ValueError):
+    """Raised for uploads the client has to fix, as opposed to storage failures."""
+
+
+class FileTooLargeError(UploadRejectedError):
+    """Raised when an upload exceeds MAX_FILE_MB."""
+
+
+class UnsupportedFileTypeError(UploadRejectedError):
+    """Raised when an upload's content is not one of the accepted image formats."""
+
+
+def max_upload_bytes() -> int:
+    return settings.MAX_FILE_MB * MB
+
+
+def max_request_bytes() -> int:
+    if settings.MAX_REQUEST_MB is not None:
+        return settings.MAX_REQUEST_MB * MB
+    # A full set of photos plus room for the form fields
+    return (settings.MAX_PHOTOS_PER_PROPERTY * settings.MAX_FILE_MB + 1) * MB
+
+
+def sniff_image_type(head: bytes) -> Optional[tuple]:
+    """Returns (content type, extension) for the image format `head` starts with, or None."""
+    for signature, content_type, extension in _SIGNATURES:
+        if head.startswith(signature):
+            return content_type, extension
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp", "webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis"):
+        return "image/avif", "avif"
+    return None
+
+
+async def check_upload(file: UploadFile) -> tuple:
+    """
+    Validates an upload before it is read: the declared size, when known, and the
+    file's leading bytes. The client's Content-Type is not trusted.
+
+    Returns:
+        The sniffed (content type, extension).
+
+    Raises:
+        FileTooLargeError: If the upload is larger than MAX_FILE_MB.
+        UnsupportedFileTypeError: If it is not a JPEG, PNG, WebP or AVIF image.
+    """
+    if file.size is not None and file.size > max_upload_bytes():
+        raise FileTooLargeError(f"File exceeds the {settings.MAX_FILE_MB} MB limit")
+    head = await file.read(_SNIFF_BYTES)
+    await file.seek(0)
+    sniffed = sniff_image_type(head)
+    if sniffed is None:
+        raise UnsupportedFileTypeError("Only JPEG, PNG, WebP and AVIF images are accepted")
+    return sniffed
+
+
+async def iter_limited_chunks(file: UploadFile, chunk_size: int, max_bytes: Optional[int] = None) -> AsyncIterator[bytes]:
+    """
+    Yields the upload in `chunk_size` pieces and aborts with FileTooLargeError as soon
+    as more than `max_bytes` (MAX_FILE_MB by default) have been read.
+    """
+    max_bytes = max_bytes or max_upload_bytes()
+    total = 0
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_bytes:
+            raise FileTooLargeError(f"File exceeds the {settings.MAX_FILE_MB} MB limit")
+        yield chunk
+
+
+class UploadByteBudget:
+    """
+    Caps the upload bytes a worker holds at once. Each upload reserves its size, or
+    MAX_FILE_MB when the size is unknown, and waits while the budget is exhausted.
+    A reservation larger than the whole budget is clamped so it can still run alone.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.in_flight = 0
+        self._condition: Optional[asyncio.Condition] = None
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        # Created lazily so it binds to the running event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    @asynccontextmanager
+    async def reserve(self, size: int):
+        size = min(size, self.capacity)
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight + size <= self.capacity)
+            self.in_flight += size
+        try:
+            yield
+        finally:
+            async with self.condition:
+                self.in_flight -= size
+                self.condition.notify_all()
+
+
+upload_budget = UploadByteBudget(settings.UPLOAD_INFLIGHT_MAX_MB * MB)
+
+
+def reservation_size(file: UploadFile) -> int:
+    return file.size if file.size is not None else max_upload_bytes()
+
+
+class RequestSizeLimitMiddleware:
+    """
+    Rejects request bodies larger than `max_request_bytes` with 413 before they are
+    parsed: up front from Content-Length, or as soon as a streamed body passes the
+    limit. Per-file limits only apply once Starlette has spooled the whole form.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = max_request_bytes()
+        detail = f"Request body exceeds the {limit // MB} MB limit"
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            response = JSONResponse({"detail": detail}, status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside body parsing, which passes HTTPException through
+                    raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
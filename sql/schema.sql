@@ -16,6 +16,7 @@ CREATE TABLE IF NOT EXISTS properties (
     house_type VARCHAR(50),
     amenities JSONB DEFAULT '[]'::jsonb,
     photos JSONB DEFAULT '[]'::jsonb,
+    photo_variants JSONB DEFAULT '[]'::jsonb,
     status propertystatus NOT NULL DEFAULT 'PENDING',
     lat FLOAT,
     lon FLOAT,
@@ -44,6 +45,8 @@ CREATE INDEX IF NOT EXISTS idx_properties_location ON properties (location);
 CREATE INDEX IF NOT EXISTS idx_properties_price ON properties (price);
 CREATE INDEX IF NOT EXISTS idx_properties_lat_lon ON properties USING GIST(ll_to_earth(lat, lon));
 CREATE INDEX IF NOT EXISTS fts_idx ON properties USING gin(fts);
+CREATE INDEX IF NOT EXISTS idx_properties_approved_created_at_id ON properties (created_at, id) WHERE status = 'APPROVED';
+CREATE INDEX IF NOT EXISTS idx_properties_approved_price_id ON properties (price, id) WHERE status = 'APPROVED';
 CREATE OR REPLACE FUNCTION update_fts_column() RETURNS trigger AS $$  
 BEGIN
   NEW.fts := to_tsvector('english', NEW.title || ' ' || NEW.description || ' ' || NEW.location || ' ' || COALESCE(NEW.house_type, ''));
@@ -53,4 +56,17 @@ END;
 DROP TRIGGER IF EXISTS update_fts ON properties;
 CREATE TRIGGER update_fts
 BEFORE INSERT OR UPDATE ON properties
-FOR EACH ROW EXECUTE PROCEDURE update_fts_column();
\ No newline at end of file
+FOR EACH ROW EXECUTE PROCEDURE update_fts_column();
+
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL,
+    message TEXT NOT NULL,
+    status VARCHAR(7) NOT NULL DEFAULT 'PENDING',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    last_error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    sent_at TIMESTAMP WITH TIME ZONE
+);
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_pending_next_attempt ON notification_outbox (next_attempt_at) WHERE status = 'PENDING';
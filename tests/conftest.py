@@ -1,16 +1,20 @@
 import pytest
 import os
+import uuid
 from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.main import app
+from app.dependencies.auth import get_current_owner
 from app.dependencies.database import get_db
 from app.models.property import Base
+from app.utils.geo import register_sqlite_functions
 
 # Use a separate test database
 TEST_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 
 engine = create_async_engine(TEST_DATABASE_URL, echo=True)
+register_sqlite_functions(engine)
 TestingSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 async def override_get_db():
@@ -44,3 +48,15 @@ def setup_database():
 def client():
     with TestClient(app) as c:
         yield c
+
+OWNER_ID = uuid.UUID('a1b2c3d4-e5f6-a7b8-c9d0-e1f2a3b4c5d6')
+
+@pytest.fixture
+def owner_override():
+    """Authenticates requests as an Owner, with user_id a str as the real auth returns it."""
+    app.dependency_overrides[get_current_owner] = lambda: {
+        "user": {"user_id": str(OWNER_ID), "role": "Owner", "preferred_language": "en"},
+        "token": "owner-token",
+    }
+    yield
+    app.dependency_overrides.pop(get_current_owner, None)
@@ -0,0 +1,60 @@
+import asyncio
+import time
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from jose import jwt
+
+from app.config import settings
+from app.dependencies import auth
+from app.services.http_clients import http_clients
+from app.utils.cache import cache_stats
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_local_auth_mode_skips_remote_verification(monkeypatch):
+    """Tests that local mode authorizes from signed claims and verifies remotely only periodically."""
+    monkeypatch.setattr(settings, "AUTH_MODE", "local")
+    monkeypatch.setattr(settings, "AUTH_REVOCATION_SAMPLE_RATE", 0.0)
+    token = jwt.encode(
+        {"sub": "a1b2c3d4-e5f6-a7b8-c9d0-e1f2a3b4c5d6", "role": "Owner", "exp": int(time.time()) + 60},
+        settings.JWT_SECRET, algorithm="HS256"
+    )
+
+    with patch("app.dependencies.auth.verify_token_remote") as mock_verify, \
+         patch("app.dependencies.auth.get_user_data") as mock_get_user:
+        users = [await auth.get_current_user(token) for _ in range(3)]
+
+    assert users[0] == {"user_id": "a1b2c3d4-e5f6-a7b8-c9d0-e1f2a3b4c5d6", "role": "Owner"}
+    assert mock_verify.call_count == 1 # The first use of the token is checked for revocation
+    mock_get_user.assert_not_called()
+
+
+async def test_user_data_cache_single_flight():
+    """Tests that concurrent lookups for one token share a single verification and are then served locally."""
+    token = f"single-flight-{uuid.uuid4()}"
+    requests = []
+
+    async def handler(request: httpx.Request):
+        requests.append(request)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"user_id": "a1b2c3d4-e5f6-a7b8-c9d0-e1f2a3b4c5d6", "role": "Owner"})
+
+    hits_before = cache_stats()["user_data"]["hits"]
+    http_clients.start(transport=httpx.MockTransport(handler))
+    try:
+        with patch.object(auth.redis_client, "get", new_callable=AsyncMock, return_value=None), \
+             patch.object(auth.redis_client, "setex", new_callable=AsyncMock):
+            results = await asyncio.gather(*(auth.get_user_data(token) for _ in range(10)))
+            again = await auth.get_user_data(token)
+    finally:
+        await http_clients.aclose()
+
+    assert len(requests) == 1
+    assert requests[0].url.path.endswith("/auth/verify")
+    assert all(r["role"] == "Owner" for r in results)
+    assert again == results[0]
+    assert cache_stats()["user_data"]["hits"] == hits_before + 1
@@ -0,0 +1,29 @@
+import pytest
+
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_circuit_breaker_fails_fast():
+    """Tests that the breaker opens after repeated upstream failures and ignores non-failures."""
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60, is_failure=lambda e: isinstance(e, ConnectionError))
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        raise ConnectionError("down")
+
+    async def not_found():
+        raise LookupError("missing")
+
+    with pytest.raises(LookupError):
+        await breaker.call(not_found)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await breaker.call(failing)
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(failing)
+
+    assert len(calls) == 2
+    assert breaker.state == CircuitBreaker.OPEN
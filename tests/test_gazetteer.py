@@ -0,0 +1,20 @@
+from app.services.gazetteer import get_gazetteer
+from app.services.gebeta import normalize_location
+
+
+def test_geocode_location_normalization():
+    """Tests that equivalent spellings of a location share one geocoding cache key."""
+    assert normalize_location("  Bole,  Addis   Abäba ") == "bole, addis ababa"
+    assert normalize_location("BOLE ,addis ababa") == "bole, addis ababa"
+
+
+def test_gazetteer_resolves_known_locations():
+    """Tests that known places, aliases and misspellings resolve without Gebeta."""
+    gazetteer = get_gazetteer()
+    bole = gazetteer.lookup(normalize_location("Bole, Addis Ababa"))
+    assert bole == {"lat": 9.005401, "lon": 38.790374}
+    assert gazetteer.lookup("kazanchiz") == gazetteer.lookup("kazanchis")
+    assert gazetteer.lookup("piazza") == gazetteer.lookup("piassa")
+    # Same street name in another town is left to Gebeta; the town is the fallback
+    assert gazetteer.lookup("bole road, mekelle") is None
+    assert gazetteer.lookup_area("bole road, mekelle") == gazetteer.lookup("mekelle")
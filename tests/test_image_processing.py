@@ -0,0 +1,27 @@
+import io
+
+import pytest
+from PIL import Image
+
+from app.utils.image_processing import InvalidImageError, process_image
+
+
+def test_process_image_variants():
+    """Tests that uploads are rotated per EXIF, stripped and resized without upscaling."""
+    source = Image.new("RGB", (800, 400), "red")
+    exif = Image.Exif()
+    exif[0x0112] = 6 # Orientation: rotate 90 degrees clockwise
+    buffer = io.BytesIO()
+    source.save(buffer, format="JPEG", exif=exif)
+
+    processed = process_image(buffer.getvalue(), "WEBP", 80, 1600, (320, 640, 1024))
+
+    assert processed.content_type == "image/webp"
+    assert sorted(processed.variants) == [320]
+    full = Image.open(io.BytesIO(processed.full))
+    assert full.size == (400, 800)
+    assert not full.getexif()
+    assert Image.open(io.BytesIO(processed.variants[320])).size == (320, 640)
+
+    with pytest.raises(InvalidImageError):
+        process_image(b"not an image", "WEBP", 80, 1600, (320,))
@@ -0,0 +1,74 @@
+import httpx
+import pytest
+
+from app.config import settings
+from app.services.http_clients import http_clients
+from app.services.notification import NotificationSender
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_notifications_sent_in_bulk_with_single_send_fallback():
+    """Tests bulk delivery with per-message results, and single sends when bulk is unsupported."""
+    paths = []
+
+    def handler(bulk_supported):
+        def handle(request: httpx.Request):
+            paths.append(request.url.path)
+            if request.url.path.endswith("/send/batch"):
+                if not bulk_supported:
+                    return httpx.Response(404)
+                return httpx.Response(200, json={"results": [{"delivered": True}, {"delivered": False, "error": "unknown user"}]})
+            return httpx.Response(200)
+        return handle
+
+    async def send(bulk_supported):
+        http_clients.start(transport=httpx.MockTransport(handler(bulk_supported)))
+        try:
+            return await NotificationSender().send_many([("user-1", "hello"), ("user-2", "hello")])
+        finally:
+            await http_clients.aclose()
+
+    results = await send(True)
+    assert [r.delivered for r in results] == [True, False]
+    assert results[1].error == "unknown user"
+    assert len(paths) == 1
+
+    paths.clear()
+    results = await send(False)
+    assert all(r.delivered for r in results)
+    assert sorted(paths) == ["/send", "/send", "/send/batch"]
+
+
+async def test_bulk_endpoint_probed_again_after_cooldown(monkeypatch):
+    """A missing bulk endpoint switches to single sends only until the retry cooldown passes."""
+    paths = []
+    bulk_available = False
+
+    def handle(request: httpx.Request):
+        paths.append(request.url.path)
+        if request.url.path.endswith("/send/batch") and not bulk_available:
+            return httpx.Response(404)
+        return httpx.Response(200)
+
+    sender = NotificationSender()
+    http_clients.start(transport=httpx.MockTransport(handle))
+    try:
+        await sender.send_many([("user-1", "hello")])
+        assert not sender.bulk_supported
+
+        paths.clear()
+        await sender.send_many([("user-1", "hello")])
+        assert paths == ["/send"]
+
+        bulk_available = True
+        monkeypatch.setattr(settings, "NOTIFICATION_BULK_RETRY_SECONDS", 0)
+        sender._mark_bulk_unsupported()
+        paths.clear()
+        results = await sender.send_many([("user-1", "hello"), ("user-2", "hello")])
+    finally:
+        await http_clients.aclose()
+
+    assert all(r.delivered for r in results)
+    assert paths == ["/send/batch"]
+    assert sender.bulk_supported
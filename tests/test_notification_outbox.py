@@ -0,0 +1,44 @@
+import uuid
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select
+
+from app.models.notification_outbox import NotificationOutbox, OutboxStatus
+from app.services import notification_outbox
+from app.services.notification import NotificationResult
+from tests.conftest import TestingSessionLocal
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_notification_outbox_retries_failed_sends():
+    """Tests that the dispatcher marks delivered notifications sent and backs off failed ones."""
+    delivered_id, failing_id = uuid.uuid4(), uuid.uuid4()
+
+    async def post(items):
+        return [
+            NotificationResult(user_id, False, "notification service unavailable")
+            if user_id == str(failing_id) else NotificationResult(user_id, True)
+            for user_id, _ in items
+        ]
+
+    async with TestingSessionLocal() as db:
+        notification_outbox.enqueue_notification(db, delivered_id, "approved")
+        notification_outbox.enqueue_notification(db, failing_id, "approved")
+        await db.commit()
+
+    with patch.object(notification_outbox, "AsyncSessionLocal", TestingSessionLocal), \
+         patch.object(notification_outbox, "post_notifications", side_effect=post):
+        await notification_outbox.dispatch_notification_outbox()
+
+    async with TestingSessionLocal() as db:
+        rows = (await db.execute(
+            select(NotificationOutbox).where(NotificationOutbox.user_id.in_([delivered_id, failing_id]))
+        )).scalars().all()
+    rows = {row.user_id: row for row in rows}
+
+    assert rows[delivered_id].status == OutboxStatus.SENT
+    assert rows[failing_id].status == OutboxStatus.PENDING
+    assert rows[failing_id].attempts == 1
+    assert rows[failing_id].last_error == "notification service unavailable"
@@ -0,0 +1,22 @@
+import pytest
+
+from app.utils.object_storage import StorageBackend, _run_blocking, shutdown_object_storage
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_storage_calls_work_after_shutdown():
+    """A second app lifecycle gets a fresh storage thread pool."""
+    assert await _run_blocking(sum, [1, 2]) == 3
+    shutdown_object_storage()
+    assert await _run_blocking(sum, [3, 4]) == 7
+    shutdown_object_storage()
+
+
+async def test_incomplete_storage_backend_fails_on_creation():
+    class UploadOnlyBackend(StorageBackend):
+        async def upload(self, object_name, chunks, content_type):
+            return object_name
+
+    with pytest.raises(TypeError):
+        UploadOnlyBackend()
@@ -5,7 +5,9 @@ from uuid import uuid4
 from decimal import Decimal
 
 from app.config import settings
-from app.models.property import Property, PropertyStatus
+from app.models.property import Property, PropertyStatus, PaymentStatus
+from app.utils.object_storage import StoredPhoto
+from tests.conftest import TestingSessionLocal
 
 # Mark all tests in this file as async
 pytestmark = pytest.mark.asyncio
@@ -25,7 +27,7 @@ def mock_property_data():
         "amenities": ["WiFi", "Parking"],
     }
 
-@patch("app.routers.properties.upload_file_to_object_storage", return_value="http://fake.url/image.jpg")
+@patch("app.routers.properties.upload_photos_to_object_storage", return_value=[StoredPhoto(url="http://fake.url/image.jpg")])
 @patch("app.routers.properties.geocode_location_with_fallback", return_value={"lat": 9.0, "lon": 38.0})
 @patch("app.dependencies.auth.get_current_owner")
 class TestSubmitProperty:
@@ -98,7 +100,7 @@ class TestPaymentConfirmationWebhook:
     async def test_confirmation_success(self, client: TestClient, setup_property):
         prop_id, payment_id = await setup_property
         
-        with patch("app.routers.payments.send_notification", new_callable=MagicMock) as mock_send_notification:
+        with patch("app.routers.payments.enqueue_notification", new_callable=MagicMock) as mock_enqueue_notification:
             payload = {
                 "property_id": str(prop_id),
                 "payment_id": str(payment_id),
@@ -110,7 +112,7 @@ class TestPaymentConfirmationWebhook:
             
             assert response.status_code == 200
             assert response.json()["status"] == "received"
-            mock_send_notification.assert_called_once()
+            mock_enqueue_notification.assert_called_once()
 
             # Verify property status in DB
             from app.dependencies.database import TestingSessionLocal
@@ -169,3 +171,60 @@ class TestPaymentConfirmationWebhook:
         async with TestingSessionLocal() as session:
             prop = await session.get(Property, prop_id)
             assert prop.status == PropertyStatus.PENDING
+
+
+async def seed_pending_payment():
+    prop_id, payment_id = uuid4(), uuid4()
+    async with TestingSessionLocal() as session:
+        session.add(Property(
+            id=prop_id,
+            user_id=uuid4(),
+            payment_id=payment_id,
+            title="Webhook Replay",
+            description="Desc",
+            location="Loc",
+            price=Decimal("500.00"),
+            house_type="private home",
+            status=PropertyStatus.PENDING
+        ))
+        await session.commit()
+    return prop_id, payment_id
+
+
+async def test_confirmation_replay_is_applied_once(client: TestClient):
+    prop_id, payment_id = await seed_pending_payment()
+    payload = {"property_id": str(prop_id), "payment_id": str(payment_id), "status": "SUCCESS", "tx_ref": "tx-replay"}
+    headers = {"X-API-Key": settings.PROPERTY_WEBHOOK_API_KEY}
+
+    with patch("app.routers.payments.enqueue_notification", new_callable=MagicMock) as mock_enqueue_notification:
+        first = client.post("/api/v1/payments/confirm", json=payload, headers=headers)
+        replay = client.post("/api/v1/payments/confirm", json=payload, headers=headers)
+        late_failure = client.post("/api/v1/payments/confirm", json={**payload, "status": "FAILED"}, headers=headers)
+
+    assert first.json() == {"status": "received", "property_status": "APPROVED", "payment_status": "SUCCESS"}
+    assert replay.status_code == 200
+    assert replay.json()["status"] == "already_processed"
+    assert late_failure.json()["status"] == "already_processed"
+    mock_enqueue_notification.assert_called_once()
+
+    async with TestingSessionLocal() as session:
+        prop = await session.get(Property, prop_id)
+    assert prop.payment_status == PaymentStatus.SUCCESS
+    assert prop.payment_tx_ref == "tx-replay"
+    assert prop.approval_timestamp is not None
+
+
+async def test_confirmation_for_another_payment_is_ignored(client: TestClient):
+    prop_id, _ = await seed_pending_payment()
+    payload = {"property_id": str(prop_id), "payment_id": str(uuid4()), "status": "SUCCESS"}
+    headers = {"X-API-Key": settings.PROPERTY_WEBHOOK_API_KEY}
+
+    with patch("app.routers.payments.enqueue_notification", new_callable=MagicMock) as mock_enqueue_notification:
+        response = client.post("/api/v1/payments/confirm", json=payload, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ignored", "property_status": "PENDING", "payment_status": "PENDING"}
+    mock_enqueue_notification.assert_not_called()
+    async with TestingSessionLocal() as session:
+        prop = await session.get(Property, prop_id)
+    assert prop.payment_status == PaymentStatus.PENDING
@@ -0,0 +1,162 @@
+import json
+import time
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.models.property import Property, PaymentStatus
+from app.services import payment_jobs
+from app.services.payment_initiation import claim_payment_initiation
+from app.services.payment_jobs import (
+    JOB_FAILED, JOB_QUEUED, JOB_SUCCEEDED, PaymentJob, PaymentJobQueue, PaymentJobQueueUnavailable, get_payment_job
+)
+from tests.conftest import OWNER_ID, TestingSessionLocal
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def job_store(monkeypatch):
+    """Replaces the job status Redis with a dict."""
+    store = {}
+    redis_mock = MagicMock()
+    redis_mock.setex = AsyncMock(side_effect=lambda key, ttl, value: store.__setitem__(key, value))
+    redis_mock.get = AsyncMock(side_effect=lambda key: store.get(key))
+    monkeypatch.setattr(payment_jobs, "redis_client", redis_mock)
+    monkeypatch.setattr(payment_jobs, "AsyncSessionLocal", TestingSessionLocal)
+    return store
+
+
+async def create_property() -> uuid.UUID:
+    property_id = uuid.uuid4()
+    async with TestingSessionLocal() as db:
+        db.add(Property(id=property_id, user_id=OWNER_ID, title="Pay me", description="d", location="Bole", price=100))
+        await db.commit()
+    return property_id
+
+
+async def claimed_job() -> PaymentJob:
+    property_id = await create_property()
+    async with TestingSessionLocal() as db:
+        claim = await claim_payment_initiation(db, property_id, OWNER_ID)
+    return PaymentJob(claim=claim, user_id=OWNER_ID, access_token="owner-token")
+
+
+async def load(property_id: uuid.UUID) -> Property:
+    async with TestingSessionLocal() as db:
+        return await db.get(Property, property_id)
+
+
+async def test_async_approve_and_pay_returns_job(client: TestClient, owner_override):
+    property_id = await create_property()
+
+    with patch.object(payment_jobs.payment_job_queue, "enqueue", new_callable=AsyncMock) as mock_enqueue:
+        response = client.patch(f"/api/v1/properties/{property_id}/approve-and-pay?async=true")
+
+    assert response.status_code == 202
+    job = mock_enqueue.await_args.args[0]
+    assert response.json() == {"job_id": job.job_id, "property_id": str(property_id), "status": JOB_QUEUED}
+    assert response.headers["Location"] == f"/api/v1/properties/payment-jobs/{job.job_id}"
+    assert (await load(property_id)).payment_status == PaymentStatus.INITIATING
+
+
+async def test_async_approve_and_pay_falls_back_to_sync(client: TestClient, owner_override):
+    property_id = await create_property()
+    payment_id = uuid.uuid4()
+    initiate = AsyncMock(return_value=(uuid.uuid4(), payment_id, "tx-ref", "https://checkout.example/1"))
+
+    with patch.object(payment_jobs.payment_job_queue, "enqueue", AsyncMock(side_effect=PaymentJobQueueUnavailable("full"))), \
+         patch("app.services.payment_initiation.initiate_payment", initiate):
+        response = client.patch(f"/api/v1/properties/{property_id}/approve-and-pay?async=true")
+
+    assert response.status_code == 200
+    assert response.json()["payment_id"] == str(payment_id)
+    initiate.assert_awaited_once()
+
+
+async def test_enqueue_unavailable_when_full_or_redis_down(job_store, monkeypatch):
+    monkeypatch.setattr(settings, "PAYMENT_JOB_QUEUE_SIZE", 1)
+    monkeypatch.setattr(settings, "PAYMENT_JOB_WORKERS", 0)
+    queue = PaymentJobQueue()
+    with pytest.raises(PaymentJobQueueUnavailable):
+        await queue.enqueue(await claimed_job()) # not started
+
+    queue.start()
+    queued = await claimed_job()
+    await queue.enqueue(queued)
+    with pytest.raises(PaymentJobQueueUnavailable):
+        await queue.enqueue(await claimed_job()) # full
+    await queue.stop()
+
+    # Jobs that never ran are released and reported failed
+    released = await load(queued.claim.property_id)
+    assert released.payment_status == PaymentStatus.PENDING
+    assert (await get_payment_job(queued.job_id))["status"] == JOB_FAILED
+
+    queue.start()
+    payment_jobs.redis_client.setex.side_effect = RedisError("down")
+    with pytest.raises(PaymentJobQueueUnavailable):
+        await queue.enqueue(await claimed_job())
+    await queue.stop()
+
+
+async def test_process_records_success(job_store):
+    job = await claimed_job()
+    payment_id = uuid.uuid4()
+    initiate = AsyncMock(return_value=(uuid.uuid4(), payment_id, "tx-ref", "https://checkout.example/1"))
+
+    with patch("app.services.payment_initiation.initiate_payment", initiate):
+        await PaymentJobQueue()._process(job)
+
+    record = await get_payment_job(job.job_id)
+    assert record["status"] == JOB_SUCCEEDED
+    assert record["checkout_url"] == "https://checkout.example/1"
+    prop = await load(job.claim.property_id)
+    assert prop.payment_status == PaymentStatus.PENDING
+    assert prop.payment_id == payment_id
+    assert initiate.await_args.kwargs["request_id"] == job.claim.request_id
+
+
+async def test_process_releases_claim_on_failure(job_store):
+    job = await claimed_job()
+
+    with patch("app.services.payment_initiation.initiate_payment", AsyncMock(side_effect=HTTPException(400, "rejected"))):
+        await PaymentJobQueue()._process(job)
+
+    record = await get_payment_job(job.job_id)
+    assert record["status"] == JOB_FAILED
+    assert record["status_code"] == 400
+    prop = await load(job.claim.property_id)
+    assert prop.payment_status == PaymentStatus.PENDING
+    assert prop.payment_request_id is None # a definite rejection drops the idempotency key
+
+
+async def test_stale_job_reported_failed(job_store):
+    job = await claimed_job()
+    await payment_jobs._save_job(job, JOB_QUEUED)
+    record = json.loads(job_store[payment_jobs._job_key(job.job_id)])
+    record["updated_at"] = time.time() - settings.PAYMENT_INITIATION_LEASE_SECONDS - 1
+    job_store[payment_jobs._job_key(job.job_id)] = json.dumps(record)
+
+    assert (await get_payment_job(job.job_id))["status"] == JOB_FAILED
+
+
+async def test_poll_payment_job_checks_owner(client: TestClient, owner_override, job_store):
+    job = await claimed_job()
+    await payment_jobs._save_job(job, JOB_QUEUED)
+    other = PaymentJob(claim=(await claimed_job()).claim, user_id=uuid.uuid4(), access_token="other-token")
+    await payment_jobs._save_job(other, JOB_QUEUED)
+
+    own = client.get(f"/api/v1/properties/payment-jobs/{job.job_id}")
+    assert own.status_code == 200
+    assert own.json()["status"] == JOB_QUEUED
+    assert client.get(f"/api/v1/properties/payment-jobs/{other.job_id}").status_code == 404
+    assert client.get(f"/api/v1/properties/payment-jobs/{uuid.uuid4()}").status_code == 404
+
+    payment_jobs.redis_client.get.side_effect = RedisError("down")
+    assert client.get(f"/api/v1/properties/payment-jobs/{job.job_id}").status_code == 503
@@ -0,0 +1,38 @@
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select
+
+from app.models.notification_outbox import NotificationOutbox
+from app.models.property import Property, PaymentStatus, PropertyStatus
+from app.services import property_cleanup
+from tests.conftest import TestingSessionLocal
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_cleanup_stale_properties_in_chunks():
+    """Tests that stale pending listings are failed chunk by chunk with an outbox notification each."""
+    async with TestingSessionLocal() as db:
+        stale_at = datetime.utcnow() - timedelta(days=10)
+        stale = [
+            Property(user_id=uuid.uuid4(), title=f"Stale {i}", description="d", location="Bole", price=100, created_at=stale_at)
+            for i in range(5)
+        ]
+        db.add_all(stale)
+        await db.commit()
+
+    with patch.object(property_cleanup, "AsyncSessionLocal", TestingSessionLocal), \
+         patch.object(property_cleanup.settings, "CLEANUP_BATCH_SIZE", 2):
+        await property_cleanup.cleanup_stale_pending_properties()
+
+    async with TestingSessionLocal() as db:
+        rows = (await db.execute(select(Property).where(Property.id.in_([p.id for p in stale])))).scalars().all()
+        queued = (await db.execute(
+            select(NotificationOutbox.user_id).where(NotificationOutbox.user_id.in_([p.user_id for p in stale]))
+        )).scalars().all()
+
+    assert all(p.payment_status == PaymentStatus.FAILED and p.status == PropertyStatus.REJECTED for p in rows)
+    assert sorted(queued) == sorted(p.user_id for p in rows)
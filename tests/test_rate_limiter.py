@@ -0,0 +1,22 @@
+import asyncio
+import time
+
+import pytest
+
+from app.utils.rate_limiter import AsyncRateLimiter
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_payment_rate_limiter_pause_holds_every_caller():
+    """Tests that the shared rate limiter spaces calls out and that a pause delays all waiting callers."""
+    limiter = AsyncRateLimiter(rate=50, burst=1)
+    start = time.monotonic()
+    await limiter.acquire()
+    await limiter.acquire()
+    assert time.monotonic() - start >= 0.015
+
+    limiter.pause(0.1)
+    start = time.monotonic()
+    await asyncio.gather(limiter.acquire(), limiter.acquire())
+    assert time.monotonic() - start >= 0.1
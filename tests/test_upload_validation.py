@@ -0,0 +1,69 @@
+import io
+
+import httpx
+import pytest
+from fastapi import FastAPI, File, UploadFile
+
+from app.config import settings
+from app.utils.upload_validation import (
+    MB, FileTooLargeError, RequestSizeLimitMiddleware, UnsupportedFileTypeError, check_upload, iter_limited_chunks
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+async def read_all(data: bytes, max_bytes: int) -> bytes:
+    upload = UploadFile(io.BytesIO(data), filename="photo.jpg")
+    await check_upload(upload)
+    return b"".join([chunk async for chunk in iter_limited_chunks(upload, 4, max_bytes)])
+
+
+async def test_upload_validation_rejects_oversized_and_non_images():
+    """Tests that uploads are type-checked by content and size-checked while streaming."""
+    jpeg = b"\xff\xd8\xff\xe0" + b"\x00" * 20
+    assert await read_all(jpeg, 1024) == jpeg
+    with pytest.raises(FileTooLargeError):
+        await read_all(jpeg, 16)
+    with pytest.raises(UnsupportedFileTypeError):
+        await read_all(b"<html>not an image</html>", 1024)
+
+
+@pytest.fixture
+def limited_client(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_REQUEST_MB", 1)
+    app = FastAPI()
+    app.add_middleware(RequestSizeLimitMiddleware)
+    app.state.handled = 0
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        app.state.handled += 1
+        return {"size": file.size}
+
+    return app, httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def test_request_body_limit(limited_client):
+    """Oversized bodies get 413 before the form is parsed, whether or not Content-Length is sent."""
+    app, client = limited_client
+
+    async def streamed(size):
+        # A well-formed multipart body sent without Content-Length
+        yield b'--x\r\nContent-Disposition: form-data; name="file"; filename="a.jpg"\r\n\r\n'
+        for _ in range(size // (64 * 1024)):
+            yield b"\0" * (64 * 1024)
+        yield b"\r\n--x--\r\n"
+
+    async with client:
+        small = await client.post("/upload", files={"file": ("a.jpg", b"\xff\xd8\xff" * 10, "image/jpeg")})
+        declared = await client.post("/upload", files={"file": ("a.jpg", b"\0" * (2 * MB), "image/jpeg")})
+        undeclared = await client.post(
+            "/upload",
+            content=streamed(2 * MB),
+            headers={"Content-Type": "multipart/form-data; boundary=x"},
+        )
+
+    assert small.status_code == 200
+    assert declared.status_code == 413
+    assert undeclared.status_code == 413
+    assert app.state.handled == 1
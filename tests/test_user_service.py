@@ -0,0 +1,97 @@
+import json
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services import user_service
+from app.services.http_clients import http_clients
+from app.services.user_service import get_owner_profile, get_owner_profiles, get_user_by_id
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_user_service_uses_shared_http_client():
+    """Tests that outbound calls go through the injectable shared client."""
+    requests = []
+
+    def handler(request: httpx.Request):
+        requests.append(request)
+        return httpx.Response(200, json={"id": "user-1", "phone_number": "+251900000000"})
+
+    http_clients.start(transport=httpx.MockTransport(handler))
+    try:
+        await get_user_by_id("user-1", "token")
+        user = await get_user_by_id("user-1", "token")
+    finally:
+        await http_clients.aclose()
+
+    assert user["id"] == "user-1"
+    assert len(requests) == 2
+    assert requests[0].headers["Authorization"] == "Bearer token"
+
+
+@pytest.fixture
+def user_service_requests():
+    """
+    Routes user-service calls to a mock transport that knows `users` and answers 404
+    otherwise. Redis never has the profiles, so repeated lookups must be served locally.
+    """
+    users, requests = {}, []
+
+    def handler(request: httpx.Request):
+        requests.append(request)
+        if request.url.path.endswith("/users/batch"):
+            ids = json.loads(request.content)["ids"]
+            return httpx.Response(200, json=[users[i] for i in ids if i in users])
+        user = users.get(request.url.path.rsplit("/", 1)[-1])
+        return httpx.Response(200, json=user) if user else httpx.Response(404)
+
+    http_clients.start(transport=httpx.MockTransport(handler))
+    with patch.object(user_service.redis_client, "mget", new_callable=AsyncMock,
+                      side_effect=lambda keys: [None] * len(keys)):
+        yield users, requests
+    http_clients.start()
+
+
+async def test_owner_profile_cache_hit(user_service_requests):
+    """Tests that a fetched owner profile is served from the local cache afterwards."""
+    users, requests = user_service_requests
+    user_id = str(uuid.uuid4())
+    users[user_id] = {"id": user_id, "phone_number": "+251900000000"}
+
+    first = await get_owner_profile(user_id)
+    second = await get_owner_profile(user_id)
+
+    assert first == second == users[user_id]
+    assert len(requests) == 1
+
+
+async def test_unknown_owner_is_negative_cached(user_service_requests):
+    """Tests that a 404 from the user service is cached, so the next lookup does not go upstream."""
+    _, requests = user_service_requests
+    user_id = str(uuid.uuid4())
+
+    assert await get_owner_profile(user_id) is None
+    assert await get_owner_profile(user_id) is None
+    assert len(requests) == 1
+    assert requests[0].url.path.endswith(f"/users/{user_id}")
+
+
+async def test_owner_profiles_batch_lookup(user_service_requests, monkeypatch):
+    """Tests that several misses share one batch request and unknown ids come back as None."""
+    monkeypatch.setattr(settings, "USER_SERVICE_BATCH_ENABLED", True)
+    users, requests = user_service_requests
+    known, unknown = [str(uuid.uuid4()) for _ in range(2)], str(uuid.uuid4())
+    for user_id in known:
+        users[user_id] = {"id": user_id, "phone_number": "+251900000000"}
+
+    profiles = await get_owner_profiles(known + [unknown])
+    again = await get_owner_profiles(known + [unknown])
+
+    assert profiles == again == {known[0]: users[known[0]], known[1]: users[known[1]], unknown: None}
+    assert len(requests) == 1
+    assert requests[0].method == "POST"
+    assert json.loads(requests[0].content) == {"ids": known + [unknown]}